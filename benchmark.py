@@ -0,0 +1,112 @@
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional
+
+import core
+from llm.backends import LocalBackend
+from scenarios import generator, jsonPicker, snapshot
+from tools import solver, toolList
+from tools.worldState import WorldState
+
+
+def _time(fn: Callable, repeat: int, setup: Optional[Callable] = None) -> Dict:
+    # setup() τρέχει εκτός χρονομέτρησης (π.χ. καινούριο world state για tools που το αλλάζουν)
+    samples = []
+    for _ in range(repeat):
+        arg = setup() if setup else None
+        t0 = time.perf_counter()
+        fn(arg) if setup else fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return {"best_ms": min(samples), "median_ms": statistics.median(samples), "repeat": repeat}
+
+
+def bench_size(n_nodes: int, repeat: int = 5, latency: float = 0.0, optimal_max: int = 10000,
+               planners=("llm", "greedy"), seed: int = 0) -> List[Dict]:
+    """Times the loader, the tools, the solver and full agent episodes on one synthetic scenario size."""
+    data = generator.generate_scenario(n_nodes, seed=seed)
+    results = []
+
+    def record(name: str, timing: Dict, **extra):
+        results.append({"nodes": n_nodes, "benchmark": name, **timing, **extra})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, f"generated_{n_nodes}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        record("load_world_state", _time(lambda: jsonPicker.load_world_state(path), repeat),
+               file_kb=round(os.path.getsize(path) / 1024, 1))
+        record("stream_world_state", _time(lambda: jsonPicker.stream_world_state(path), repeat))
+        snap_path = snapshot.save_snapshot(WorldState.from_dict(data), os.path.join(tmp, f"generated_{n_nodes}.wsnap"))
+        record("load_snapshot", _time(lambda: snapshot.load_snapshot(snap_path), repeat),
+               file_kb=round(os.path.getsize(snap_path) / 1024, 1))
+
+    record("WorldState.from_dict", _time(lambda: WorldState.from_dict(data), repeat))
+    world = WorldState.from_dict(data)
+    broken = toolList.detect_failure_nodes(world)
+    record("detect_failure_nodes", _time(lambda: toolList.detect_failure_nodes(world), repeat), broken=len(broken))
+    record("estimate_impacts", _time(lambda: toolList.estimate_impacts(world, broken), repeat))
+    reports = list(toolList.estimate_impacts(world, broken).values())
+    record("solver.greedy", _time(lambda: solver.greedy_assignment(reports, world), repeat))
+    if n_nodes <= optimal_max:
+        record("solver.optimal", _time(lambda: solver.optimal_assignment(reports, world), repeat))
+    pairs = solver.greedy_assignment(reports, world)
+    record("assign_repair_crew",
+           _time(lambda w: toolList.assign_repair_crew(w, [n for n, _ in pairs], [c for _, c in pairs]), repeat,
+                 setup=lambda: WorldState.from_dict(data)), pairs=len(pairs))
+
+    for planner in planners:
+        step_ms, episode_ms, steps = [], [], 0
+        for _ in range(repeat):
+            # Χωρίς terminal/log: τα μηνύματα (και τα dumps των prompts) δεν χτίζονται καν
+            agent = core.InfrastructureAgent(WorldState.from_dict(data), max_steps=15,
+                                             backend=LocalBackend(latency=latency), planner=planner,
+                                             trace_formats=(), log_level="off", console_level="off")
+            t_episode = time.perf_counter()
+            while agent.state != core.AgentState.FINAL and agent.step_count < agent.max_steps:
+                t0 = time.perf_counter()
+                agent.step()
+                step_ms.append((time.perf_counter() - t0) * 1000)
+            episode_ms.append((time.perf_counter() - t_episode) * 1000)
+            steps = agent.step_count
+        record(f"agent.step[{planner}]", {"best_ms": min(step_ms), "median_ms": statistics.median(step_ms),
+                                           "repeat": len(step_ms)})
+        record(f"agent.episode[{planner}]", {"best_ms": min(episode_ms), "median_ms": statistics.median(episode_ms),
+                                              "repeat": repeat}, steps=steps, llm_calls=agent.llm_calls)
+    return results
+
+
+def print_results(results: List[Dict]):
+    print(f"{'nodes':>8}  {'benchmark':<26}{'best ms':>12}{'median ms':>12}  extra")
+    for r in results:
+        extra = {k: v for k, v in r.items() if k not in ("nodes", "benchmark", "best_ms", "median_ms", "repeat")}
+        print(f"{r['nodes']:>8}  {r['benchmark']:<26}{r['best_ms']:>12.3f}{r['median_ms']:>12.3f}  "
+              f"{extra if extra else ''}")
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Offline benchmarks (mock LLM backend, synthetic scenarios).")
+    parser.add_argument("--sizes", default="10,100,1000,10000", help="comma separated node counts (up to 100000)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.0, help="simulated LLM latency per call (seconds)")
+    parser.add_argument("--planners", default="llm,greedy", help="planners to time full episodes with")
+    parser.add_argument("--optimal-max", type=int, default=10000, help="largest size to run solver.optimal on")
+    parser.add_argument("--json", default=None, help="also write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    results = []
+    for n in (int(x) for x in args.sizes.split(",")):
+        results.extend(bench_size(n, repeat=args.repeat, latency=args.latency, optimal_max=args.optimal_max,
+                                  planners=tuple(args.planners.split(","))))
+    print_results(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,11 @@ import importlib.util
 import os
 import sys
 import json
+import threading
+
+# Τίποτα σε αυτό το αρχείο δεν τρέχει κατά το import: δεν γίνεται input(), εγκατάσταση ή εκκίνηση server.
+# Οι ρυθμίσεις διαβάζονται lazily (USE_CLOUD, runs_path) και οι έλεγχοι του backend γίνονται
+# μία φορά, όταν χρειαστούν (ensure_backend_ready), ώστε το import να κοστίζει ms και να γίνεται από workers.
 
 Warning_message = """
 \nΠΡΟΣΟΧΗ!
@@ -17,36 +22,46 @@ Warning_message = """
  Γραμμή 29 @config.py:
  CLOUD_API_KEY = "" #βάλτε το δικό σας API key apo https://console.groq.com -> φτιάξε account -> φτιάξε key βάλτο εδώ (συνήθως ξεκινάει με gsk_)
  Χρησιμοποιούμε την πλατφόρμα groq για τα κλειδιά μας, για δωρεάν χρήση (με όριο) μοντέλο openai-gpt-oss.128\n\n\n"""
-print(Warning_message)
-
 VERBOSE = True
 
 CONFIG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "llm_config.json")
+USE_CLOUD_ENV = "OLLAMA_AGENT_USE_CLOUD"  # "1"/"0" - υπερισχύει του llm_config.json
 
-if os.path.exists(CONFIG_FILE) and __name__ != "__main__":
-    with open(CONFIG_FILE, 'r') as f:
-        USE_CLOUD = json.load(f).get("use_cloud", False)
-else:
-    if VERBOSE: cloud = input("Do you want to use Cloud LLM [y/n]: ")
-    USE_CLOUD = (cloud.lower() == 'y') if VERBOSE else False
-    with open(CONFIG_FILE, 'w') as f:
-        json.dump({"use_cloud": USE_CLOUD}, f)
-
-# True = groq api | False = Ollama - local
-if VERBOSE: print(f"[CONFIG] Cloud enabled: {USE_CLOUD}")
+# True = groq api | False = Ollama - local  (βλ. get_use_cloud)
 CLOUD_PROVIDER = "groq"  # 'groq' ή 'openai'
 
 
 #----ΒΑΛΤΕ ΤΟ groq api key παρακάτω ανάμεσα στα CLOUD_API_KEY = "here"----
 ################################################################################################################################################
-CLOUD_API_KEY = "" #βάλτε το δικό σας API key apo https://console.groq.com -> φτιάξε account -> φτιάξε key βάλτο εδώ (συνήθως ξεκινάει με gsk_)
+CLOUD_API_KEY = os.environ.get("GROQ_API_KEY", "") #βάλτε το δικό σας API key apo https://console.groq.com -> φτιάξε account -> φτιάξε key βάλτο εδώ (συνήθως ξεκινάει με gsk_)
 ################################################################################################################################################
 
 
 CLOUD_MODEL = "openai/gpt-oss-120b"
-
-if __name__ == '__main__':
-    if VERBOSE: print(f"[CONFIG] downlods probably get sent: {os.getcwd()}")
+OLLAMA_MODEL = "qwen3:4b"
+OLLAMA_HOST = None  # None = http://localhost:11434
+
+# Ρυθμίσεις του LLM client (llm/backends.py) - ο client φτιάχνεται μία φορά και κρατάει ανοιχτές συνδέσεις
+LLM_TIMEOUT = 60.0      # seconds ανά request
+LLM_MAX_RETRIES = 3     # επαναλήψεις σε σφάλμα δικτύου
+LLM_BACKOFF = 0.5       # αρχική καθυστέρηση (x2 σε κάθε retry)
+LLM_POOL_SIZE = 10      # keep-alive connections
+
+TRACE_FORMATS = ("jsonl",)  # per-step trace δίπλα στο run log: "jsonl" και/ή "chrome" (chrome://tracing), () = κανένα
+PROMPT_TOKEN_BUDGET = 4000  # μέγιστο μέγεθος prompt (system + context) σε tokens, None = χωρίς όριο
+
+# Cache αποφάσεων του LLM (llm/decisionCache.py) - ίδιο prompt + context + μοντέλο => ίδια απόφαση χωρίς κλήση
+LLM_CACHE = False                   # opt-in
+LLM_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "llm_cache.sqlite")  # None = μόνο στη μνήμη
+LLM_CACHE_MAX_ENTRIES = 10000
+LLM_CACHE_TTL = None                # seconds, None = χωρίς λήξη
+
+# Log κάθε run (runlog.py) - γράφεται από background thread, ένα αρχείο ανά agent
+# Επίπεδα: "debug" (όλα, και τα prompts) | "info" | "decision" (μόνο αποφάσεις) | "warning", None = τίποτα
+LOG_LEVEL = "debug"          # στο αρχείο
+LOG_CONSOLE_LEVEL = "debug"  # στο terminal
+LOG_FORMAT = "text"          # "text" ή "jsonl" (μία εγγραφή JSON ανά γραμμή)
+LOG_COMPRESS = False         # gzip (.gz)
 
 seed = "1407931694"
 assigned_domain = "Infrastructure Failure Management Agent"
@@ -55,28 +70,89 @@ assigned_domain = "Infrastructure Failure Management Agent"
 #----ΒΑΛΤΕ ΤΟ path που θέλετε να πηγαίνουν τα runs σας (κενό = πάνε στο ίδιο μέρος με αυτό το script)----
 #################################################################################################################################################
 base_path = r"" #    <-ανάμεσα απο τα ""    
-runs_path = os.path.join(base_path, "")
 #################################################################################################################################################
 
-# Δημιουργία φακέλου runs (και του base_path αν λείπει)
-try:
-    os.makedirs(runs_path, exist_ok=True)
-    if __name__ == '__main__':
-        if VERBOSE: print(f"[CONFIG] Path found/created: {runs_path}")
-except OSError:
-    # Fallback σε local αν αποτύχει (π.χ. δεν υπάρχει το drive)
-    base_path = os.getcwd()
-    runs_path = os.path.join(base_path, "runs")
-    os.makedirs(runs_path, exist_ok=True)
-    if __name__ == '__main__':
-        if VERBOSE: print(f"[CONFIG] Warning: Drive path failed. Using local: {runs_path}")
-
 seed_int = int(seed)
 print_every = 100
 
+_lock = threading.Lock()
+_settings = {}
+_ready = set()
+# Ένα lock ανά backend: η εγκατάσταση / το pull του μοντέλου (λεπτά) δεν μπλοκάρει το _lock των settings
+_backend_locks = {"cloud": threading.Lock(), "ollama": threading.Lock()}
+
+
+def get_use_cloud() -> bool:
+    """Cloud (groq) ή local (Ollama): από το env, αλλιώς από το llm_config.json, αλλιώς False. Χωρίς ερωτήσεις."""
+    with _lock:
+        if "use_cloud" not in _settings:
+            env = os.environ.get(USE_CLOUD_ENV)
+            if env is not None:
+                _settings["use_cloud"] = env.strip().lower() in ("1", "true", "yes", "y")
+            elif os.path.exists(CONFIG_FILE):
+                with open(CONFIG_FILE, 'r') as f:
+                    _settings["use_cloud"] = json.load(f).get("use_cloud", False)
+            else:
+                _settings["use_cloud"] = False
+        return _settings["use_cloud"]
+
+
+def get_runs_path() -> str:
+    """Ο φάκελος των runs, δημιουργείται την πρώτη φορά που ζητηθεί."""
+    with _lock:
+        if "runs_path" not in _settings:
+            # Δημιουργία φακέλου runs (και του base_path αν λείπει)
+            runs_path = os.path.join(base_path, "")
+            try:
+                os.makedirs(runs_path, exist_ok=True)
+            except OSError:
+                # Fallback σε local αν αποτύχει (π.χ. δεν υπάρχει το drive)
+                runs_path = os.path.join(os.getcwd(), "runs")
+                os.makedirs(runs_path, exist_ok=True)
+            _settings["runs_path"] = runs_path
+        return _settings["runs_path"]
+
+
+def __getattr__(name):
+    # config.USE_CLOUD / config.runs_path υπολογίζονται μόνο όταν ζητηθούν
+    if name == "USE_CLOUD":
+        return get_use_cloud()
+    if name == "runs_path":
+        return get_runs_path()
+    raise AttributeError(f"module 'config' has no attribute '{name}'")
+
+
+def interactive_setup(force: bool = False) -> bool:
+    """
+    Η ερώτηση cloud/local της πρώτης εκτέλεσης. Καλείται μόνο από το CLI (runner.main) και μόνο
+    αν δεν υπάρχει llm_config.json (ή force=True) και υπάρχει terminal. Αποθηκεύει την απάντηση.
+    """
+    if not force and (os.path.exists(CONFIG_FILE) or os.environ.get(USE_CLOUD_ENV) is not None):
+        return get_use_cloud()
+    if not sys.stdin or not sys.stdin.isatty():
+        return get_use_cloud()
+    print(Warning_message)
+    cloud = input("Do you want to use Cloud LLM [y/n]: ")
+    use_cloud = cloud.lower() == 'y'
+    with open(CONFIG_FILE, 'w') as f:
+        json.dump({"use_cloud": use_cloud}, f)
+    with _lock:
+        _settings["use_cloud"] = use_cloud
+    if VERBOSE: print(f"[CONFIG] Cloud enabled: {use_cloud}")
+    return use_cloud
+
+
+def _ollama_server_up() -> bool:
+    import urllib.request
+    try:
+        urllib.request.urlopen(OLLAMA_HOST or "http://localhost:11434", timeout=1)
+        return True
+    except Exception:
+        return False
 
-# ΕΛΕΓΧΟΣ & ΕΓΚΑΤΑΣΤΑΣΗ OLLAMA (ΜΟΝΟ ΑΝ ΔΕΝ ΕΙΝΑΙ CLOUD)
-if not USE_CLOUD:
+
+def _prepare_ollama():
+    # ΕΛΕΓΧΟΣ & ΕΓΚΑΤΑΣΤΑΣΗ OLLAMA (ΜΟΝΟ ΑΝ ΔΕΝ ΕΙΝΑΙ CLOUD)
     if not shutil.which("ollama"):
         if VERBOSE: print("[CONFIG] Το Ollama δεν βρέθηκε. Γίνεται εγκατάσταση...")
         if sys.platform.startswith("win"):
@@ -90,35 +166,56 @@ if not USE_CLOUD:
             if sys.platform.startswith("linux") and shutil.which("apt-get"):
                 subprocess.run(["sudo", "apt-get", "install", "-y", "zstd"], check=True)
             subprocess.run("curl -fsSL https://ollama.com/install.sh | sh", shell=True, check=True)
-    else:
-        if VERBOSE: print("[CONFIG] Το Ollama binary είναι ήδη εγκατεστημένο.")
 
-    # ΕΚΚΙΝΗΣΗ SERVER
-    try:
-        import urllib.request
-        urllib.request.urlopen("http://localhost:11434")
-        if VERBOSE: print("[CONFIG] Ο Ollama Server τρέχει ήδη.")
-    except:
+    # ΕΚΚΙΝΗΣΗ SERVER (περιμένουμε μέχρι να απαντήσει, όχι σταθερό sleep)
+    if not _ollama_server_up():
         if VERBOSE: print("[CONFIG] Εκκίνηση του Ollama Server στο background...")
         with open("ollama_log.txt", "w") as log_file:
             subprocess.Popen(["ollama", "serve"], stdout=log_file, stderr=log_file)
-        time.sleep(5)
+        deadline = time.monotonic() + 15
+        while not _ollama_server_up() and time.monotonic() < deadline:
+            time.sleep(0.2)
 
     # ΚΑΤΕΒΑΣΜΑ ΜΟΝΤΕΛΟΥ
     result = subprocess.run(["ollama", "list"], capture_output=True, text=True)
-    if "qwen3:4b" not in result.stdout:
-        if VERBOSE: print("[CONFIG] Το μοντέλο qwen3:4b δεν βρέθηκε. Κατέβασμα...")
-        subprocess.run(["ollama", "pull", "qwen3:4b"], check=True)
+    if OLLAMA_MODEL not in result.stdout:
+        if VERBOSE: print(f"[CONFIG] Το μοντέλο {OLLAMA_MODEL} δεν βρέθηκε. Κατέβασμα...")
+        subprocess.run(["ollama", "pull", OLLAMA_MODEL], check=True)
 
     # ΕΓΚΑΤΑΣΤΑΣΗ ΒΙΒΛΙΟΘΗΚΗΣ PYTHON OLLAMA
     if importlib.util.find_spec("ollama") is None:
         if VERBOSE: print("[CONFIG] Εγκατάσταση βιβλιοθήκης Python 'ollama'...")
         subprocess.check_call([sys.executable, "-m", "pip", "install", "ollama"])
 
-if importlib.util.find_spec("openai") is None:
-    if VERBOSE: print("[CONFIG] Εγκατάσταση βιβλιοθήκης Python 'openai' (για Cloud)...")
-    subprocess.check_call([sys.executable, "-m", "pip", "install", "openai"])
 
-if VERBOSE: print("\n[CONFIG] Όλα έτοιμα! Μπορείς να τρέξεις τον Agent.")
+def _prepare_cloud():
+    if importlib.util.find_spec("openai") is None:
+        if VERBOSE: print("[CONFIG] Εγκατάσταση βιβλιοθήκης Python 'openai' (για Cloud)...")
+        subprocess.check_call([sys.executable, "-m", "pip", "install", "openai"])
 
-WORLD_STATE = {} #global ώστε να μην μπερδεύονται με την main του 'core.py' 
\ No newline at end of file
+
+def ensure_backend_ready(kind: str):
+    """
+    Φέρνει το backend σε κατάσταση λειτουργίας ('cloud': openai package, 'ollama': binary, server,
+    μοντέλο, python package). Τρέχει μία φορά ανά process και backend, την πρώτη φορά που χρειαστεί.
+    """
+    if kind in _ready:
+        return
+    with _backend_locks.setdefault(kind, threading.Lock()):
+        if kind in _ready:
+            return
+        if kind == "ollama":
+            _prepare_ollama()
+        elif kind == "cloud":
+            _prepare_cloud()
+        _ready.add(kind)
+        if VERBOSE: print(f"[CONFIG] Backend '{kind}' έτοιμο.")
+
+
+if __name__ == '__main__':
+    # python config.py: ρωτάει ξανά cloud/local και ετοιμάζει το backend
+    use_cloud = interactive_setup(force=True)
+    if VERBOSE: print(f"[CONFIG] downlods probably get sent: {os.getcwd()}")
+    if VERBOSE: print(f"[CONFIG] Path found/created: {get_runs_path()}")
+    ensure_backend_ready("cloud" if use_cloud else "ollama")
+    if VERBOSE: print("\n[CONFIG] Όλα έτοιμα! Μπορείς να τρέξεις τον Agent.")
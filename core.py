@@ -1,48 +1,29 @@
-import json, time, os, sys
+import asyncio, json, time, os
 from enum import Enum
-from typing import Dict
+from typing import Callable, Dict, Optional, Union
 from datetime import datetime
 
 import config
-from scenarios import jsonPicker 
-from tools import toolList
+from tools import toolList, solver
+from tools.worldState import WorldState
+from llm.backends import LLMBackend, get_backend
+from llm.contextBuilder import ContextBuilder
+from telemetry import Tracer
+import runlog
+from runlog import DEBUG, INFO, DECISION, WARNING, RunLogger
 
 # ==========================================
 # 3. LLM INTERFACE
 # ==========================================
-def llm_call(system_prompt: str, user_context: str) -> Dict:
+def llm_call(system_prompt: str, user_context: str, backend: Optional[LLMBackend] = None,
+             on_action: Optional[Callable[[Dict], None]] = None, stats: Optional[Dict] = None) -> Dict:
     try:
-        if config.USE_CLOUD:
-            import openai
-            #κάνουμε import openai όχι γιατί χρησιμοποιούμε τα μοντέλα τους αλλά χρησιμοποιούμε το python client τους, για να εισάγουμε api key απο το groq
-            #overiding base url
-            base_url = "https://api.groq.com/openai/v1" if config.CLOUD_PROVIDER == "groq" else None #σύμφωνα με τα groq docs, για να κάνεις create chat completion χρησιμοποιείς το link
-            client = openai.OpenAI(api_key=config.CLOUD_API_KEY, base_url=base_url)
-            
-            response = client.chat.completions.create(
-                model=config.CLOUD_MODEL,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_context}
-                ],
-                response_format={"type": "json_object"},
-                temperature=0.1
-            )
-            content = response.choices[0].message.content
-            # Καθαρισμός αν το μοντέλο επιστρέψει markdown code block
-            if content.strip().startswith("```json"):
-                content = content.strip()[7:-3]
-            elif content.strip().startswith("```"):
-                content = content.strip()[3:-3]
-            return json.loads(content)
-        else:
-            # Local Ollama fallback
-            import ollama
-            response = ollama.chat(model="qwen3:4b", messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_context}
-            ], format="json", options={"temperature": 0.1})
-            return json.loads(response["message"]["content"])
+        # Ο backend (και οι συνδέσεις του) ζει σε όλη τη διάρκεια του process, δεν ξαναφτιάχνεται σε κάθε κλήση
+        backend = backend or get_backend()
+        if on_action is not None:
+            # Streaming: το on_action καλείται μόλις ολοκληρωθούν τα 'action'/'arguments'
+            return backend.complete_streaming(system_prompt, user_context, on_action, stats)
+        return backend.complete(system_prompt, user_context, stats)
     except Exception as e:
         return {"thought": f"LLM error: {str(e)}", "action": "none", "arguments": {}, "next_state": "FINAL"}
 
@@ -52,115 +33,178 @@ def llm_call(system_prompt: str, user_context: str) -> Dict:
 class AgentState(Enum):
     DETECT, ANALYZE, PLAN, ACT, WAIT, FINAL = "DETECT", "ANALYZE", "PLAN", "ACT", "WAIT", "FINAL"
 
+EXPLAIN_PROMPT = """
+    You are an Autonomous Infrastructure Failure Management Agent.
+    A deterministic solver has ALREADY computed the crew assignment in 'plan' from the impact reports and crews below
+    ('General' crews fix anything, specialists only their type, priority by criticality then population).
+    Do NOT change the plan. Explain briefly why it is the right one.
+    You must respond ONLY with a valid JSON object containing: "thought": your explanation.
+    """
+
 class InfrastructureAgent:
-    def __init__(self, max_steps=20):
+    def __init__(self, world_state: Union[WorldState, Dict], max_steps=20, backend: Optional[LLMBackend] = None,
+                 planner: str = "llm", explain_plan: bool = False, context_builder: Optional[ContextBuilder] = None,
+                 streaming: bool = False, tracer: Optional[Tracer] = None, trace_formats: Optional[tuple] = None,
+                 simulate_repairs: bool = True, seed: Optional[int] = None, log_level: Optional[str] = None,
+                 console_level: Optional[str] = None, log_format: Optional[str] = None,
+                 log_compress: Optional[bool] = None):
+        """
+        planner: 'llm' (the model picks the assignment) or 'greedy' / 'optimal' (tools/solver.py
+        computes it directly; the LLM is only asked for an explanation if explain_plan=True and is
+        used as a fallback when there are no impact reports to plan from).
+        streaming: stream the LLM response and run the tool as soon as 'action'/'arguments' are parsed.
+        tracer: collects per-step spans, exported next to the run log in trace_formats
+        ('jsonl' and/or 'chrome', None = config.TRACE_FORMATS).
+        simulate_repairs: instead of FINAL while broken nodes wait for crews that are still repairing,
+        go to WAIT, which fast-forwards the simulated clock to the next repair completion (no LLM call)
+        and returns to PLAN once a freed crew can take one of them.
+        seed: reseeds the world's RNG (repair durations) so the episode is reproducible.
+        log_level / console_level: verbosity of the run log file / the terminal ('debug' includes the
+        prompts, 'decision' keeps only decisions and warnings, 'off'); log_format 'text' or 'jsonl';
+        log_compress gzips the file. None = the config.LOG_* value.
+        """
+        if planner not in solver.PLANNERS:
+            raise ValueError(f"Unknown planner '{planner}' (expected one of {solver.PLANNERS})")
+        if not isinstance(world_state, WorldState):
+            world_state = WorldState.from_dict(world_state)
+        self.world_state = world_state  # κάθε agent έχει το δικό του world state (όχι global)
+        if seed is not None:
+            world_state.rng.seed(seed)
+        self.backend = backend or get_backend()
         self.state = AgentState.DETECT
         self.step_count = 0
         self.max_steps = max_steps
+        self.planner = planner
+        self.explain_plan = explain_plan
+        self.streaming = streaming
+        self.simulate_repairs = simulate_repairs
+        self.context_builder = context_builder or ContextBuilder(token_budget=config.PROMPT_TOKEN_BUDGET)
+        self.prompt_stats = []  # μέγεθος prompt ανά βήμα (tokens)
+        self.tracer = tracer or Tracer()
+        self.llm_calls = 0
+        self.trace_formats = config.TRACE_FORMATS if trace_formats is None else trace_formats
         self.memory = {"context": {}, "history": []}
+        self.log_level = config.LOG_LEVEL if log_level is None else log_level
+        self.console_level = config.LOG_CONSOLE_LEVEL if console_level is None else console_level
+        self.log_format = log_format or config.LOG_FORMAT
+        self.log_compress = config.LOG_COMPRESS if log_compress is None else log_compress
+        self.logger = RunLogger(None, console_level=self.console_level)  # μόνο terminal μέχρι το _open_log
+        self._log_base = None
+
+    def log(self, message: str = "", level: int = INFO, kind: str = "message", **fields):
+        # Στο terminal και στο log αυτού του agent μέσω του background writer (το βήμα δεν περιμένει I/O)
+        self.logger.log(message, level, kind, step=self.step_count, **fields)
 
     def get_system_prompt(self):
-        base = """
-            You are an Autonomous Infrastructure Failure Management Agent.
-            GOAL: Analyze infrastructure failures and assign the best available repair crews based on criticality.
-            
-            AVAILABLE TOOLS:
-            1. detect_failure_nodes() -> list: Returns broken node IDs.
-            2. estimate_impact(node_id: str) -> dict: Returns impact metrics (population, criticality).
-            3. assign_repair_crew(node_ids: list, crew_ids: list) -> dict: Assigns crews to nodes.
-            4. check_crew_availability() -> Dict: Crew IDs mapped to their current status ('Available' or 'Busy').
-            5. none: Use this if you just want to change state without calling a tool.
-
-            RULES FOR PLANNING:
-            - You must match available crews to nodes. 
-            - 'General' crews can fix anything. Specialized crews only fix their type.
-            - Prioritize 'Critical' nodes over 'High/Medium/Low'.
-            - CRITICAL PRIORITY: If multiple nodes are broken, you MUST compare their population. ALWAYS prioritize fixing the node with the HIGHEST population first.
-
-            RESPONSE FORMAT:
-            You must respond ONLY with a valid JSON object containing:
-            - "thought": Explain your reasoning (Chain-of-Thought).
-            - "action": The name of the tool to call.
-            - "arguments": A dictionary of arguments for the tool.
-            - "next_state": The next state to transition to (DETECT, ANALYZE, PLAN, ACT, WAIT, FINAL).
-            """
-        
-        # State-specific dynamic instructions to help the small model
-        state_guidance = {
-            AgentState.DETECT: "CURRENT STATE: DETECT. You MUST call 'detect_failure_nodes' to identify issues. Do NOT transition to FINAL yet.",
-            AgentState.ANALYZE: "CURRENT STATE: ANALYZE. You MUST call 'estimate_impact' for one node from 'remaining_to_analyze'. If 'remaining_to_analyze' is empty, transition to PLAN.",
-            AgentState.PLAN: "CURRENT STATE: PLAN. You MUST call 'assign_repair_crew' to fix 'failed_nodes'. If all nodes are assigned or no crews are available, transition to FINAL.",
-            AgentState.WAIT: "CURRENT STATE: WAIT. No action needed. If no actions are available, Trasnition to FINAL."
-        }
-        
-        return base + "\n" + state_guidance.get(self.state, "")
+        return self.context_builder.system_prompt(self.state.value)
 
     def step(self):
         self.step_count += 1
-        print(f"\n{'='*50}\nSTEP {self.step_count} | CURRENT STATE: {self.state.value}\n{'='*50}")
+        self.log(f"\n{'='*50}\nSTEP {self.step_count} | CURRENT STATE: {self.state.value}\n{'='*50}",
+                 kind="step", state=self.state.value)
+        with self.tracer.span("step", step=self.step_count, state=self.state.value) as step_span:
+            self._step()
+            step_span["next_state"] = self.state.value
+
+    def _step(self):
+        if self.state == AgentState.WAIT and self.simulate_repairs:
+            # Event-driven WAIT: δεν ρωτάμε το LLM, απλώς τρέχει το ρολόι της προσομοίωσης
+            with self.tracer.span("wait", step=self.step_count) as span:
+                self._wait_for_repairs(span)
+            return
 
         # 1. OBSERVE: Gather context for the LLM
-        available_crews = [c for c, d in config.WORLD_STATE["crews"].items() if d["status"] == "Available"]
-        failures = self.memory["context"].get("failures", [])
-        analyzed_reports = self.memory["context"].get("impact_reports", [])
-        analyzed_ids = [r["node_id"] for r in analyzed_reports if "node_id" in r]
-        remaining_to_analyze = [n for n in failures if n not in analyzed_ids]
-        
-        recent_history = self.memory["history"]
-
-        context_data = {
-            "current_state": self.state.value,
-            "past_actions": recent_history,
-            "failed_nodes": failures,          #λειτουργία με memory
-            "remaining_to_analyze": remaining_to_analyze,
-            "impact_reports": analyzed_reports,
-            "available_crews": available_crews,
-        }
-        
-        user_context = json.dumps(context_data, indent=2)
-        system_prompt = self.get_system_prompt()
+        with self.tracer.span("context_build", step=self.step_count) as span:
+            crews = self.world_state.crews
+            # Με την ειδικότητα, ώστε το LLM να ξέρει ποιο crew μπορεί να φτιάξει ποιον κόμβο
+            available_crews = [{"crew_id": c, "specialty": crews[c].specialty}
+                               for c in self.world_state.crew_ids_with_status("Available")]
+            failures = self.memory["context"].get("failures", [])
+            # node_id -> report, ώστε ο έλεγχος "έχει αναλυθεί;" να είναι O(1)
+            impact_reports = self.memory["context"].setdefault("impact_reports", {})
+            analyzed_reports = list(impact_reports.values())
+            remaining_to_analyze = [n for n in failures if n not in impact_reports]
 
-        # Απαίτηση της εκφώνησης: Εκτύπωση του Prompt
-        print(f"[PROMPT]: {system_prompt}\nCONTEXT DATA: {user_context}")
-        
-        # 2. THINK: Call LLM
-        decision = llm_call(system_prompt, user_context)
-        
-        # Απαίτηση της εκφώνησης: Εκτύπωση του Raw LLM output
-        print(f"[RAW LLM]: {json.dumps(decision, indent=2)}")
+            recent_history = self.memory["history"]
+
+            context_data = {
+                "current_state": self.state.value,
+                "past_actions": recent_history,
+                "failed_nodes": failures,          #λειτουργία με memory
+                "remaining_to_analyze": remaining_to_analyze,
+                "impact_reports": analyzed_reports,
+                "available_crews": available_crews,
+            }
+
+            use_solver = self.state == AgentState.PLAN and self.planner != "llm" and bool(analyzed_reports)
+            if not use_solver:
+                # Το prompt χτίζεται μόνο όταν θα το δει το LLM (ο solver δουλεύει πάνω στο context_data)
+                system_prompt, user_context, prompt_stats = self.context_builder.build(self.state.value, context_data)
+                self.prompt_stats.append({"step": self.step_count, **prompt_stats})
+                span.update(prompt_stats)
+
+        # 2. THINK: Solver fast path in PLAN, otherwise call the LLM
+        early = {}  # action -> observation των tools που έτρεξαν ήδη κατά το streaming
+        if use_solver:
+            with self.tracer.span("solver", step=self.step_count, planner=self.planner):
+                decision = self._solver_decision(analyzed_reports, context_data)
+        else:
+            # Απαίτηση της εκφώνησης: Εκτύπωση του Prompt (σε επίπεδο debug, ώστε να κλείνει σε production)
+            if self.logger.enabled(DEBUG):
+                self.log(f"[PROMPT]: {system_prompt}\nCONTEXT DATA: {user_context}", DEBUG, "prompt",
+                         system_prompt=system_prompt, user_context=user_context)
+                self.log(f"[PROMPT SIZE]: {prompt_stats}", DEBUG, "prompt_size", stats=prompt_stats)
+
+            with self.tracer.span("llm", step=self.step_count, streaming=self.streaming) as llm_stats:
+                if self.streaming:
+                    def on_action(fields):
+                        # Το tool τρέχει όσο το μοντέλο γράφει ακόμα το 'thought'
+                        early_action = fields.get("action", "none")
+                        early[early_action] = self._timed_action(early_action, fields.get("arguments", {}),
+                                                                 remaining_to_analyze, early=True)
+                    decision = llm_call(system_prompt, user_context, self.backend, on_action, llm_stats)
+                else:
+                    decision = llm_call(system_prompt, user_context, self.backend, stats=llm_stats)
+                self.llm_calls += 1
+
+            # Απαίτηση της εκφώνησης: Εκτύπωση του Raw LLM output
+            if self.logger.enabled(DEBUG):
+                self.log(f"[RAW LLM]: {json.dumps(decision, indent=2)}", DEBUG, "raw_llm", response=decision)
+            if self.logger.enabled(INFO):
+                self.log(f"[LLM TIMING]: {llm_stats}", INFO, "llm_timing", timing=llm_stats)
         
         action = decision.get("action", "none")
         args = decision.get("arguments", {})
         thought = decision.get("thought", "No reasoning provided")
         next_state_str = decision.get("next_state", self.state.value)
+        # Η απόφαση καταγράφεται πάντα (και όταν τα prompts δεν γράφονται), εκτός αν το log είναι off
+        if self.logger.enabled(DECISION):
+            self.log(f"[DECISION]: {json.dumps({'action': action, 'arguments': args, 'next_state': next_state_str, 'thought': thought}, ensure_ascii=False)}",
+                     DECISION, "decision", action=action, arguments=args, next_state=next_state_str, thought=thought)
         
-        # 3. ACT: Execute the chosen tool dynamically
-        observation = {}
-        if action == "detect_failure_nodes":
-            observation = toolList.detect_failure_nodes()
-            self.memory["context"]["failures"] = observation
-        
-        elif action == "estimate_impact":
-            node_id = args.get("node_id")
-            if node_id:
-                observation = toolList.estimate_impact(node_id)
-                self.memory["context"].setdefault("impact_reports", []).append(observation)
-            else:
-                observation = {"error": "Missing node_id argument"}
-        
-        elif action == "assign_repair_crew":
-            node_ids = args.get("node_ids", [])
-            crew_ids = args.get("crew_ids", [])
-            observation = toolList.assign_repair_crew(node_ids, crew_ids)
+        # 3. ACT: Execute the chosen tool dynamically (unless it already ran while streaming)
+        if action in early:
+            observation = early[action]
+        else:
+            observation = self._timed_action(action, args, remaining_to_analyze)
 
         # Απαίτηση της εκφώνησης: Εκτύπωση του Observation
-        print(f"[OBSERVATION]: {observation}")
+        if self.logger.enabled(INFO):
+            self.log(f"[OBSERVATION]: {observation}", INFO, "observation", action=action, observation=observation)
         
         # DYNAMIC TRANSITION: Update state based on LLM's choice
+        previous_state = self.state
         try:
             self.state = AgentState(next_state_str)
         except ValueError:
-            print(f"[WARNING] Invalid next_state '{next_state_str}' returned by LLM. Maintaining current state.")
+            self.log(f"[WARNING] Invalid next_state '{next_state_str}' returned by LLM. Maintaining current state.",
+                     WARNING, "invalid_next_state", next_state=next_state_str)
+        if self.state == AgentState.FINAL and self._repairs_can_unblock():
+            self.log(f"[CLOCK]: {self.world_state.count_nodes('Broken')} node(s) still broken, "
+                     f"{self.world_state.pending_repairs()} repair(s) in progress -> WAIT", DECISION, "wait",
+                     broken=self.world_state.count_nodes("Broken"), pending=self.world_state.pending_repairs())
+            self.state = AgentState.WAIT
+        self.tracer.instant("transition", step=self.step_count, from_state=previous_state.value, to_state=self.state.value)
 
         # Memory Management (Sliding Window)
         self.memory["history"].append({
@@ -172,52 +216,164 @@ class InfrastructureAgent:
         if len(self.memory["history"]) > 8: #αποθηκεύονται μόνο 5 προηγούμενα steps
             self.memory["history"] = self.memory["history"][-8:]
 
-    def run(self):
-        ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-        log_filename = os.path.join(config.runs_path, f"run_log_{ts}.txt")
-
-        class DualLogger:
-            def __init__(self, filepath):
-                self.terminal = sys.stdout
-                self.log = open(filepath, "w", encoding="utf-8")
-            def write(self, message):
-                self.terminal.write(message)
-                self.log.write(message)
-            def flush(self):
-                self.terminal.flush()
-                self.log.flush()
-            def close(self):
-                self.log.close()
-
-        original_stdout = sys.stdout
-        sys.stdout = DualLogger(log_filename)
+    def _repairs_can_unblock(self) -> bool:
+        return (self.simulate_repairs and self.world_state.pending_repairs() > 0
+                and self.world_state.count_nodes("Broken") > 0)
+
+    def _crew_free_for_broken(self) -> bool:
+        world = self.world_state
+        return any(world.available_crews_for(world.nodes[n].type) for n in world.node_ids_with_status("Broken"))
+
+    def _wait_for_repairs(self, span: Dict):
+        # Προχωράει από ολοκλήρωση σε ολοκλήρωση μέχρι κάποιο crew που ελευθερώθηκε να μπορεί να πάρει
+        # έναν από τους κόμβους που είναι ακόμα Broken (ή μέχρι να μην υπάρχουν άλλες επισκευές)
+        world = self.world_state
+        start = world.clock
+        completed = []
+        can_plan = self._crew_free_for_broken()
+        while world.pending_repairs() and not can_plan:
+            observation = toolList.wait_for_repairs(world)
+            completed.extend(observation["completed"])
+            can_plan = self._crew_free_for_broken()
+        observation = {"clock_min": world.clock, "completed": completed, "pending": world.pending_repairs()}
+        self.log(f"[CLOCK]: {start:.0f} -> {world.clock:.0f} min, {len(completed)} repair(s) completed",
+                 DECISION, "clock", clock_from=start, clock_to=world.clock, completed=len(completed))
+        if self.logger.enabled(INFO):
+            self.log(f"[OBSERVATION]: {observation}", INFO, "observation", action="wait_for_repairs",
+                     observation=observation)
+        span.update(clock_from=start, clock_to=world.clock, completed=len(completed))
+
+        if can_plan:
+            # Κάτι άλλαξε: νέο PLAN μόνο για τους κόμβους που είναι ακόμα Broken
+            broken = world.node_ids_with_status("Broken")
+            self.memory["context"]["failures"] = broken
+            reports = self.memory["context"].get("impact_reports", {})
+            self.memory["context"]["impact_reports"] = {n: reports[n] for n in broken if n in reports}
+            next_state = AgentState.PLAN
+        else:
+            next_state = AgentState.FINAL
+        self.tracer.instant("transition", step=self.step_count, from_state=self.state.value, to_state=next_state.value)
+        self.state = next_state
+        self.memory["history"].append({"step": self.step_count, "state": self.state.value,
+                                       "action": "wait_for_repairs", "observation": observation})
+        if len(self.memory["history"]) > 8:
+            self.memory["history"] = self.memory["history"][-8:]
+
+    def _timed_action(self, action: str, args: Dict, remaining_to_analyze, early: bool = False):
+        with self.tracer.span("tool", step=self.step_count, action=action, early=early):
+            return self._execute_action(action, args, remaining_to_analyze)
+
+    def _execute_action(self, action: str, args: Dict, remaining_to_analyze) -> Union[Dict, list]:
+        impact_reports = self.memory["context"].setdefault("impact_reports", {})
+        observation = {}
+        if action == "detect_failure_nodes":
+            observation = toolList.detect_failure_nodes(self.world_state)
+            self.memory["context"]["failures"] = observation
         
+        elif action == "estimate_impact":
+            node_id = args.get("node_id")
+            if node_id:
+                observation = toolList.estimate_impact(self.world_state, node_id)
+                if "node_id" in observation:
+                    impact_reports[node_id] = observation
+            else:
+                observation = {"error": "Missing node_id argument"}
+
+        elif action == "estimate_impacts":
+            node_ids = args.get("node_ids") or remaining_to_analyze
+            observation = toolList.estimate_impacts(self.world_state, node_ids)
+            impact_reports.update((n, r) for n, r in observation.items() if "node_id" in r)
+        
+        elif action == "assign_repair_crew":
+            node_ids = args.get("node_ids", [])
+            crew_ids = args.get("crew_ids", [])
+            observation = toolList.assign_repair_crew(self.world_state, node_ids, crew_ids)
+        return observation
+
+    def _solver_decision(self, reports, context_data: Dict) -> Dict:
+        t0 = time.perf_counter()
+        pairs = solver.plan_assignment(reports, self.world_state, self.planner)
+        elapsed_us = (time.perf_counter() - t0) * 1e6
+
+        if pairs:
+            arguments = {"node_ids": [n for n, _ in pairs], "crew_ids": [c for _, c in pairs]}
+            decision = {"thought": f"Solver ({self.planner}) assigned {len(pairs)} crew(s) by criticality, then population.",
+                        "action": "assign_repair_crew", "arguments": arguments, "next_state": "FINAL"}
+        else:
+            decision = {"thought": f"Solver ({self.planner}) found no available crew able to fix the broken nodes.",
+                        "action": "none", "arguments": {}, "next_state": "FINAL"}
+        if self.logger.enabled(DEBUG):
+            self.log(f"[SOLVER]: {self.planner} plan in {elapsed_us:.0f}us: {json.dumps(decision, indent=2)}",
+                     DEBUG, "solver", planner=self.planner, elapsed_us=round(elapsed_us, 1))
+
+        if self.explain_plan:
+            # Μόνο οι κόμβοι του plan, μέσα στο ίδιο token budget με τα υπόλοιπα prompts
+            user_context, prompt_stats = self.context_builder.build_explain(EXPLAIN_PROMPT, context_data,
+                                                                            decision["arguments"])
+            self.prompt_stats.append({"step": self.step_count, "explain": True, **prompt_stats})
+            with self.tracer.span("llm", step=self.step_count, explain=True, **prompt_stats) as llm_stats:
+                explanation = llm_call(EXPLAIN_PROMPT, user_context, self.backend, stats=llm_stats)
+                self.llm_calls += 1
+            decision["thought"] = explanation.get("thought", decision["thought"])
+            if self.logger.enabled(DEBUG):
+                self.log(f"[RAW LLM]: {json.dumps(explanation, indent=2)}", DEBUG, "raw_llm", response=explanation)
+        return decision
+
+    def _open_log(self, log_name: Optional[str]) -> Optional[str]:
+        ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+        # Το όνομα του σεναρίου μπαίνει στο αρχείο ώστε παράλληλα runs να μη γράφουν στο ίδιο log
+        prefix = f"run_log_{log_name}" if log_name else "run_log"
+        self._log_base = os.path.join(config.runs_path, f"{prefix}_{ts}")
+        ext = ".jsonl" if self.log_format == "jsonl" else ".txt"
+        self.logger = RunLogger(self._log_base + ext, self.log_level, self.console_level, self.log_format,
+                                self.log_compress, name=log_name or "agent")
+        if log_name and self.tracer.name == "agent":
+            self.tracer.name = log_name
+        self.log("--- INFRASTRUCTURE AGENT STARTED ---", runlog.WARNING, "start")
+        return self.logger.path
+
+    def _close_log(self, log_filename: str):
+        try:
+            self.log("\n--- AGENT FINISHED ---", runlog.WARNING, "finish", state=self.state.value,
+                     steps=self.step_count, llm_calls=self.llm_calls)
+            if self.logger.enabled(INFO):
+                nodes = self.world_state.to_dict()["nodes"]
+                self.log("Final World State:\n" + json.dumps(nodes, indent=2), INFO, "final_state", nodes=nodes)
+        finally:
+            self.logger.close()
+            self.logger = RunLogger(None, console_level=self.console_level)
+        if log_filename:  # None όταν το log είναι off
+            print(f"\n Το Log αποθηκεύτηκε στο αρχείο: {log_filename}")
+        if self.trace_formats:
+            for path in self.tracer.export(self._log_base, self.trace_formats):
+                print(f" Trace: {path}")
+
+    def run(self, step_delay: float = 1.0, log_name: Optional[str] = None) -> Optional[str]:
+        log_filename = self._open_log(log_name)
         try:
-            print("--- INFRASTRUCTURE AGENT STARTED ---")
-            
             while self.state != AgentState.FINAL and self.step_count < self.max_steps:
+                llm_calls = self.llm_calls
                 self.step()
-                time.sleep(1)
+                # Η καθυστέρηση αφορά μόνο τα βήματα που ρώτησαν το LLM (rate limits), όχι το WAIT/solver
+                if step_delay and self.llm_calls != llm_calls:
+                    time.sleep(step_delay)
+        finally:
+            self._close_log(log_filename)
+        return log_filename
 
-            print("\n--- AGENT FINISHED ---")
-            print("Final World State:")
-            print(json.dumps(config.WORLD_STATE["nodes"], indent=2))
+    async def arun(self, step_delay: float = 1.0, log_name: Optional[str] = None) -> Optional[str]:
+        """Same loop as run(), but yields to the event loop while waiting on the LLM and between steps."""
+        log_filename = self._open_log(log_name)
+        try:
+            while self.state != AgentState.FINAL and self.step_count < self.max_steps:
+                llm_calls = self.llm_calls
+                await asyncio.to_thread(self.step)
+                if step_delay and self.llm_calls != llm_calls:
+                    await asyncio.sleep(step_delay)
         finally:
-            sys.stdout.close()
-            sys.stdout = original_stdout
-            
-        print(f"\n Το Log αποθηκεύτηκε στο αρχείο: {log_filename}")
+            self._close_log(log_filename)
+        return log_filename
 
 if __name__ == "__main__":
-    scenario_files = jsonPicker.get_available_scenarios()
-    print(f"Found {len(scenario_files)} scenarios to run.")
-
-    for scenario_path in scenario_files:
-        scenario_name = os.path.basename(scenario_path)
-        print(f"\n{'▬'*50}\nRUNNING SCENARIO: {scenario_name}\n{'▬'*50}")
-        
-        config.WORLD_STATE.clear()
-        config.WORLD_STATE.update(jsonPicker.load_world_state(scenario_path))
-        
-        agent = InfrastructureAgent(max_steps=15)
-        agent.run()
\ No newline at end of file
+    import runner
+    runner.main()
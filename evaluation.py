@@ -0,0 +1,151 @@
+import argparse
+import json
+import os
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import product
+from typing import Dict, List, Optional, Tuple
+
+import config
+import core
+from llm.backends import LocalBackend, make_backend
+from scenarios import jsonPicker
+from tools import solver
+from tools.worldState import WorldState
+
+HORIZON_MIN = 24 * 60  # μέχρι πότε χρεώνεται η διακοπή ενός κόμβου που δεν επισκευάστηκε ποτέ
+METRICS = ("outage_pop_min", "repair_clock_min", "steps", "llm_calls", "unrepaired", "unrepaired_pop")
+
+
+@lru_cache(maxsize=None)
+def _scenario(path: str) -> str:
+    # Κάθε worker διαβάζει κάθε σενάριο μία φορά (κρατάμε το JSON κείμενο, ώστε κάθε episode να ξεκινά από καθαρό state)
+    return json.dumps(jsonPicker.load_world_state(path))
+
+
+def run_episode(scenario_path: str, seed: int, policy: str, max_steps: int = 30, backend_kind: str = "local",
+                latency: float = 0.0, horizon: float = HORIZON_MIN) -> Dict:
+    """
+    Runs one (scenario, seed, policy) episode without logs or traces and measures its outcome.
+
+    policy: a planner name ('llm', 'greedy', 'optimal'). The 'llm' policy asks `backend_kind`
+    ('local' = the rule-based mock, so thousands of episodes cost no API calls).
+
+    Returns:
+        Dict: scenario, seed, policy, outage_pop_min (sum over the initially broken nodes of
+        population x minutes until repaired), repair_clock_min (when the last repair finished),
+        steps, llm_calls, unrepaired / unrepaired_pop (broken nodes nobody was assigned to and the
+        population they serve; their outage is charged up to `horizon` minutes, or up to the last
+        repair if that is later, so leaving nodes broken never scores better), final_state, wall_ms.
+    """
+    world = WorldState.from_dict(json.loads(_scenario(scenario_path)), seed=seed)
+    broken = {n: world.nodes[n].population_affected for n in world.node_ids_with_status("Broken")}
+    backend = LocalBackend(latency=latency) if backend_kind == "local" else make_backend(backend_kind)
+    agent = core.InfrastructureAgent(world, max_steps=max_steps, backend=backend, planner=policy, trace_formats=(),
+                                     seed=seed, log_level="off", console_level="off")
+
+    t0 = time.perf_counter()
+    while agent.state != core.AgentState.FINAL and agent.step_count < agent.max_steps:
+        agent.step()
+    wall_ms = (time.perf_counter() - t0) * 1000
+
+    # Οι επισκευές που ανατέθηκαν ολοκληρώνονται (ρολόι της προσομοίωσης, χωρίς αναμονή).
+    # Όσοι κόμβοι δεν πήραν ποτέ crew μετράνε μέχρι τον ορίζοντα (ή την τελευταία επισκευή, αν είναι αργότερα).
+    while world.pending_repairs():
+        world.advance()
+    unrepaired = [n for n in broken if n not in world.repaired_at]
+    end = max(horizon, world.clock)
+    outage = sum(pop * world.repaired_at.get(n, end) for n, pop in broken.items())
+    return {"scenario": os.path.basename(scenario_path), "seed": seed, "policy": policy,
+            "outage_pop_min": outage, "repair_clock_min": world.clock, "steps": agent.step_count,
+            "llm_calls": agent.llm_calls, "unrepaired": len(unrepaired),
+            "unrepaired_pop": sum(broken[n] for n in unrepaired), "final_state": agent.state.value,
+            "wall_ms": round(wall_ms, 3)}
+
+
+def _run_episode(job: Tuple) -> Dict:
+    return run_episode(*job)
+
+
+def evaluate(scenario_paths: List[str], seeds: List[int], policies: List[str], workers: Optional[int] = None,
+             max_steps: int = 30, backend_kind: str = "local", latency: float = 0.0,
+             chunksize: Optional[int] = None, horizon: float = HORIZON_MIN) -> List[Dict]:
+    """
+    Runs every (scenario, seed, policy) combination, spread over a ProcessPoolExecutor
+    (workers=None -> all cores, workers=1 -> in this process).
+    Episodes are sent to the workers in chunks, so the pickling overhead is paid per chunk and not per episode.
+    """
+    for policy in policies:
+        if policy not in solver.PLANNERS:
+            raise ValueError(f"Unknown policy '{policy}' (expected one of {solver.PLANNERS})")
+    jobs = [(path, seed, policy, max_steps, backend_kind, latency, horizon)
+            for path, seed, policy in product(scenario_paths, seeds, policies)]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        return [_run_episode(job) for job in jobs]
+    chunksize = chunksize or max(1, len(jobs) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_run_episode, jobs, chunksize=chunksize))
+
+
+def aggregate(results: List[Dict]) -> List[Dict]:
+    """Mean / stdev of every metric per (scenario, policy), plus the share of episodes that reached FINAL."""
+    groups: Dict[Tuple[str, str], List[Dict]] = {}
+    for r in results:
+        groups.setdefault((r["scenario"], r["policy"]), []).append(r)
+    rows = []
+    for (scenario, policy), episodes in groups.items():
+        row = {"scenario": scenario, "policy": policy, "episodes": len(episodes),
+               "finished": sum(e["final_state"] == "FINAL" for e in episodes) / len(episodes)}
+        for metric in METRICS:
+            values = [e[metric] for e in episodes]
+            row[f"{metric}_mean"] = statistics.fmean(values)
+            row[f"{metric}_std"] = statistics.pstdev(values)
+        rows.append(row)
+    return rows
+
+
+def print_table(rows: List[Dict], elapsed: float, n_episodes: int):
+    print(f"\n{'='*50}\nMONTE CARLO EVALUATION ({n_episodes} episodes, {elapsed:.2f}s, "
+          f"{n_episodes / elapsed if elapsed else 0:.0f} episodes/s)\n{'='*50}")
+    print(f"{'scenario':<22}{'policy':<9}{'runs':>6}{'outage pop*min':>18}{'± std':>14}"
+          f"{'clock min':>11}{'steps':>7}{'llm':>6}{'unrep':>7}{'unrep pop':>11}{'final':>7}")
+    for r in rows:
+        print(f"{r['scenario']:<22}{r['policy']:<9}{r['episodes']:>6}{r['outage_pop_min_mean']:>18,.0f}"
+              f"{r['outage_pop_min_std']:>14,.0f}{r['repair_clock_min_mean']:>11.0f}{r['steps_mean']:>7.1f}"
+              f"{r['llm_calls_mean']:>6.1f}{r['unrepaired_mean']:>7.1f}{r['unrepaired_pop_mean']:>11,.0f}"
+              f"{r['finished']:>7.0%}")
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Seeded Monte Carlo evaluation of agent policies.")
+    parser.add_argument("--scenarios", nargs="*", default=None, help="scenario files (default: scenarios/scenario_*.json)")
+    parser.add_argument("--seeds", type=int, default=100, help="episodes per (scenario, policy)")
+    parser.add_argument("--base-seed", type=int, default=config.seed_int, help="seed of the first episode")
+    parser.add_argument("--policies", default="llm,greedy,optimal")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--max-steps", type=int, default=30)
+    parser.add_argument("--backend", choices=["cloud", "ollama", "local"], default="local",
+                        help="backend of the 'llm' policy")
+    parser.add_argument("--latency", type=float, default=0.0, help="simulated latency of the local backend")
+    parser.add_argument("--horizon", type=float, default=HORIZON_MIN,
+                        help="minutes of outage charged to a node that is never repaired")
+    parser.add_argument("--json", default=None, help="also write every episode to this JSON file")
+    args = parser.parse_args(argv)
+
+    paths = args.scenarios or jsonPicker.get_available_scenarios()
+    seeds = [args.base_seed + i for i in range(args.seeds)]
+    t0 = time.perf_counter()
+    results = evaluate(paths, seeds, args.policies.split(","), workers=args.workers, max_steps=args.max_steps,
+                       backend_kind=args.backend, latency=args.latency, horizon=args.horizon)
+    print_table(aggregate(results), time.perf_counter() - t0, len(results))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    main()
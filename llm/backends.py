@@ -0,0 +1,466 @@
+import json
+import random
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional
+
+import config
+from llm.contextBuilder import estimate_tokens
+from llm.decisionCache import DecisionCache, fingerprint, get_cache
+from llm.streamParser import IncrementalJSONParser
+from tools.worldState import crew_can_fix
+
+CRITICALITY_RANK = {"Critical": 3, "High": 2, "Medium": 1, "Low": 0}
+REQUIRED_FIELDS = ("action", "arguments", "next_state")  # χωρίς αυτά μια απόφαση δεν αποθηκεύεται στην cache
+# Σφάλματα μεταφοράς των openai / httpx / ollama clients (κατά όνομα, ώστε να μη χρειάζεται import εδώ)
+_TRANSIENT_ERRORS = {"APIConnectionError", "APITimeoutError", "TransportError", "TimeoutException"}
+
+
+def is_transient_error(exc: BaseException) -> bool:
+    """
+    True for errors worth retrying: connection failures, timeouts, HTTP 429 and 5xx.
+    Authentication, bad-request and other 4xx errors fail the same way on every attempt.
+    """
+    status = getattr(exc, "status_code", None)
+    if isinstance(status, int) and status > 0:
+        return status in (408, 429) or status >= 500
+    if isinstance(exc, (ConnectionError, TimeoutError)):
+        return True
+    return any(cls.__name__ in _TRANSIENT_ERRORS for cls in type(exc).__mro__)
+
+
+def parse_decision(content: str) -> Dict:
+    """
+    Parses the raw text returned by a model into a decision dict.
+
+    Args:
+        content (str): Raw completion text (JSON, possibly inside a markdown code block).
+
+    Returns:
+        Dict: The decoded decision ('thought', 'action', 'arguments', 'next_state').
+    """
+    content = content.strip()
+    # Καθαρισμός αν το μοντέλο επιστρέψει markdown code block
+    if content.startswith("```json"):
+        content = content[7:-3]
+    elif content.startswith("```"):
+        content = content[3:-3]
+    return json.loads(content)
+
+
+class LLMBackend:
+    """
+    Long-lived LLM client. Subclasses build their transport once (lazily, on the
+    first call) and reuse it, so HTTP keep-alive connections survive across agent steps.
+    """
+    name = "base"
+
+    def __init__(self, timeout: float = 60.0, max_retries: int = 3,
+                 backoff: float = 0.5, backoff_max: float = 8.0):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self._client = None
+        self._lock = threading.Lock()
+
+    def _build_client(self):
+        return None
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = self._build_client()
+        return self._client
+
+    def settings(self) -> Dict:
+        """Everything besides the prompt that changes the answer (part of the decision cache key)."""
+        return {"backend": self.name}
+
+    def _complete_once(self, system_prompt: str, user_context: str, usage: Dict) -> str:
+        """Returns the raw completion text; fills `usage` with tokens_in / tokens_out when known."""
+        raise NotImplementedError
+
+    def _stream_once(self, system_prompt: str, user_context: str, usage: Dict) -> Iterator[str]:
+        # Backends χωρίς streaming επιστρέφουν όλη την απάντηση σαν ένα chunk
+        yield self._complete_once(system_prompt, user_context, usage)
+
+    def _backoff_sleep(self, attempt: int):
+        delay = min(self.backoff * (2 ** attempt), self.backoff_max)
+        time.sleep(delay * (0.5 + random.random() / 2))
+
+    def complete(self, system_prompt: str, user_context: str, stats: Optional[Dict] = None) -> Dict:
+        """
+        Sends one (system, user) exchange and returns the decoded decision.
+        Transient errors (see is_transient_error) are retried with exponential backoff (and jitter);
+        any other error, or the last one once the retries are exhausted, is re-raised.
+        If `stats` is given it is filled with the call's latency and token usage.
+        """
+        t0 = time.perf_counter()
+        usage = {}
+        attempt = 0
+        while True:
+            try:
+                content = self._complete_once(system_prompt, user_context, usage)
+                break
+            except Exception as e:
+                if attempt >= self.max_retries or not is_transient_error(e):
+                    raise
+                self._backoff_sleep(attempt)
+                attempt += 1
+        if stats is not None:
+            stats.update({"latency_s": time.perf_counter() - t0, **usage})
+        return parse_decision(content)
+
+    def complete_streaming(self, system_prompt: str, user_context: str,
+                           on_action: Optional[Callable[[Dict], None]] = None,
+                           stats: Optional[Dict] = None) -> Dict:
+        """
+        Streams the completion through an IncrementalJSONParser. As soon as 'action' and
+        'arguments' are complete, on_action(fields) is called (while the model is still writing
+        the rest), so the tool can run before the response ends.
+
+        `stats` is filled with latency_s, ttft_s (time to first chunk), action_ready_s,
+        generation_s (time spent waiting on the model), decode_s (time spent parsing), token usage and
+        partial (True when the response was cut short).
+        Only transient failures before the first chunk are retried; a failure after on_action has fired returns
+        the fields parsed so far, since the tool has already run.
+        """
+        t0 = time.perf_counter()
+        attempt = 0
+        while True:
+            parser = IncrementalJSONParser()
+            usage = {}
+            ttft = action_ready = None
+            generation = decode = 0.0
+            try:
+                wait_start = time.perf_counter()
+                for chunk in self._stream_once(system_prompt, user_context, usage):
+                    now = time.perf_counter()
+                    generation += now - wait_start
+                    if ttft is None:
+                        ttft = now - t0
+                    parser.feed(chunk)
+                    decode += time.perf_counter() - now
+                    if action_ready is None and parser.has("action") and (parser.has("arguments") or parser.done):
+                        action_ready = time.perf_counter() - t0
+                        if on_action is not None:
+                            on_action(dict(parser.fields))
+                    wait_start = time.perf_counter()
+                break
+            except Exception as e:
+                if action_ready is not None:
+                    break  # το tool έχει ήδη τρέξει: κρατάμε ό,τι πρόλαβε να γράψει το μοντέλο
+                if ttft is not None or attempt >= self.max_retries or not is_transient_error(e):
+                    raise
+                self._backoff_sleep(attempt)
+                attempt += 1
+
+        now = time.perf_counter()
+        partial = not parser.done
+        try:
+            decision = parse_decision(parser.text)
+        except ValueError:
+            if not parser.has("action"):
+                raise
+            decision = dict(parser.fields)  # π.χ. το μοντέλο έκοψε το τέλος του 'thought'
+            partial = True
+        decode += time.perf_counter() - now
+        if stats is not None:
+            stats.update({"latency_s": time.perf_counter() - t0, "ttft_s": ttft, "action_ready_s": action_ready,
+                          "generation_s": generation, "decode_s": decode, "partial": partial, **usage})
+        return decision
+
+    def close(self):
+        with self._lock:
+            client, self._client = self._client, None
+        if client is not None and hasattr(client, "close"):
+            client.close()
+
+
+class OpenAIBackend(LLMBackend):
+    """Groq/OpenAI chat completions over one pooled openai.OpenAI client."""
+    name = "cloud"
+
+    def __init__(self, api_key: str, model: str, provider: str = "groq",
+                 pool_size: int = 10, keepalive_expiry: float = 30.0, **kwargs):
+        super().__init__(**kwargs)
+        self.api_key = api_key
+        self.model = model
+        self.provider = provider
+        self.pool_size = pool_size
+        self.keepalive_expiry = keepalive_expiry
+
+    def settings(self) -> Dict:
+        return {"backend": self.name, "model": self.model, "temperature": 0.1}
+
+    def _build_client(self):
+        config.ensure_backend_ready("cloud")
+        import httpx
+        import openai
+        #κάνουμε import openai όχι γιατί χρησιμοποιούμε τα μοντέλα τους αλλά χρησιμοποιούμε το python client τους, για να εισάγουμε api key απο το groq
+        #overiding base url
+        base_url = "https://api.groq.com/openai/v1" if self.provider == "groq" else None #σύμφωνα με τα groq docs, για να κάνεις create chat completion χρησιμοποιείς το link
+        http_client = openai.DefaultHttpxClient(
+            limits=httpx.Limits(max_connections=self.pool_size,
+                                max_keepalive_connections=self.pool_size,
+                                keepalive_expiry=self.keepalive_expiry),
+            timeout=httpx.Timeout(self.timeout, connect=min(self.timeout, 10.0)),
+        )
+        # Τα retries γίνονται στο LLMBackend.complete, όχι μέσα στο openai client
+        return openai.OpenAI(api_key=self.api_key, base_url=base_url,
+                             http_client=http_client, max_retries=0)
+
+    def _complete_once(self, system_prompt: str, user_context: str, usage: Dict) -> str:
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_context}
+            ],
+            response_format={"type": "json_object"},
+            temperature=0.1
+        )
+        if response.usage is not None:
+            usage.update(tokens_in=response.usage.prompt_tokens, tokens_out=response.usage.completion_tokens)
+        return response.choices[0].message.content
+
+    def _stream_once(self, system_prompt: str, user_context: str, usage: Dict) -> Iterator[str]:
+        stream = self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_context}
+            ],
+            response_format={"type": "json_object"},
+            temperature=0.1,
+            stream=True,
+            stream_options={"include_usage": True}
+        )
+        for chunk in stream:
+            if getattr(chunk, "usage", None) is not None:
+                usage.update(tokens_in=chunk.usage.prompt_tokens, tokens_out=chunk.usage.completion_tokens)
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+
+class OllamaBackend(LLMBackend):
+    """Local Ollama chat over one pooled ollama.Client."""
+    name = "ollama"
+
+    def __init__(self, model: str = "qwen3:4b", host: Optional[str] = None,
+                 pool_size: int = 10, keepalive_expiry: float = 30.0, **kwargs):
+        super().__init__(**kwargs)
+        self.model = model
+        self.host = host
+        self.pool_size = pool_size
+        self.keepalive_expiry = keepalive_expiry
+
+    def settings(self) -> Dict:
+        return {"backend": self.name, "model": self.model, "temperature": 0.1}
+
+    def _build_client(self):
+        config.ensure_backend_ready("ollama")
+        import httpx
+        import ollama
+        return ollama.Client(
+            host=self.host,
+            timeout=httpx.Timeout(self.timeout, connect=min(self.timeout, 10.0)),
+            limits=httpx.Limits(max_connections=self.pool_size,
+                                max_keepalive_connections=self.pool_size,
+                                keepalive_expiry=self.keepalive_expiry),
+        )
+
+    def _complete_once(self, system_prompt: str, user_context: str, usage: Dict) -> str:
+        response = self.client.chat(model=self.model, messages=[
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_context}
+        ], format="json", options={"temperature": 0.1})
+        usage.update(tokens_in=response.get("prompt_eval_count"), tokens_out=response.get("eval_count"))
+        return response["message"]["content"]
+
+    def _stream_once(self, system_prompt: str, user_context: str, usage: Dict) -> Iterator[str]:
+        for part in self.client.chat(model=self.model, messages=[
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_context}
+        ], format="json", options={"temperature": 0.1}, stream=True):
+            if part.get("done"):
+                usage.update(tokens_in=part.get("prompt_eval_count"), tokens_out=part.get("eval_count"))
+            if part["message"]["content"]:
+                yield part["message"]["content"]
+
+    def close(self):
+        with self._lock:
+            client, self._client = self._client, None
+        if client is not None:
+            client._client.close()
+
+
+class LocalBackend(LLMBackend):
+    """
+    Offline stand-in that answers from the context data with fixed rules
+    (no network, no model). Useful to benchmark the agent loop itself.
+
+    Args:
+        latency (float): Simulated model time per call in seconds (with streaming, half of it is
+            the time to the first chunk and the rest is spread over the chunks).
+        script (List[Dict]): Decisions to replay in order, one per call; once exhausted the rules take over.
+    """
+    name = "local"
+
+    def __init__(self, latency: float = 0.0, script: Optional[List[Dict]] = None, **kwargs):
+        kwargs.setdefault("max_retries", 0)
+        super().__init__(**kwargs)
+        self.latency = latency
+        self.script = list(script or [])
+        self._script_pos = 0
+
+    def _answer(self, system_prompt: str, user_context: str, usage: Dict) -> str:
+        with self._lock:
+            scripted = self._script_pos < len(self.script)
+            if scripted:
+                decision = self.script[self._script_pos]
+                self._script_pos += 1
+        if not scripted:
+            decision = self.decide(json.loads(user_context))
+        text = json.dumps(decision)
+        # εκτίμηση (~4 χαρακτήρες/token), δεν υπάρχει tokenizer offline
+        usage.update(tokens_in=estimate_tokens(system_prompt) + estimate_tokens(user_context),
+                     tokens_out=estimate_tokens(text))
+        return text
+
+    def _complete_once(self, system_prompt: str, user_context: str, usage: Dict) -> str:
+        if self.latency:
+            time.sleep(self.latency)
+        return self._answer(system_prompt, user_context, usage)
+
+    def _stream_once(self, system_prompt: str, user_context: str, usage: Dict) -> Iterator[str]:
+        text = self._answer(system_prompt, user_context, usage)
+        chunks = [text[i:i + 16] for i in range(0, len(text), 16)]
+        if self.latency:
+            time.sleep(self.latency / 2)
+        for chunk in chunks:
+            if self.latency:
+                time.sleep(self.latency / 2 / len(chunks))
+            yield chunk
+
+    def decide(self, context: Dict) -> Dict:
+        state = context.get("current_state")
+        if state == "DETECT":
+            return {"action": "detect_failure_nodes", "arguments": {}, "next_state": "ANALYZE",
+                    "thought": "Scanning the network for failures."}
+        if state == "ANALYZE":
+            remaining = context.get("remaining_to_analyze", [])
+            if remaining:
+                # Αν η λίστα κόπηκε λόγω token budget, κενή λίστα = όλοι οι κόμβοι
+                truncated = remaining[-1].startswith("... (+")
+                return {"action": "estimate_impacts", "arguments": {"node_ids": [] if truncated else remaining},
+                        "next_state": "PLAN", "thought": "Estimating impact of the failed nodes."}
+            return {"action": "none", "arguments": {}, "next_state": "PLAN", "thought": "All failures analyzed."}
+        if state == "PLAN":
+            reports = sorted(
+                (r for r in context.get("impact_reports", []) if isinstance(r, dict) and "node_id" in r),
+                key=lambda r: (CRITICALITY_RANK.get(r.get("criticality"), -1), r.get("population_affected", 0)),
+                reverse=True)
+            crews = [c for c in context.get("available_crews", []) if isinstance(c, dict)]
+            # Κάθε κόμβος παίρνει το πρώτο ελεύθερο crew που μπορεί να τον φτιάξει (όπως ελέγχει το assign_repair_crew)
+            pairs, used = [], set()
+            for r in reports:
+                for c in crews:
+                    if c["crew_id"] not in used and crew_can_fix(c.get("specialty", ""), r.get("type")):
+                        used.add(c["crew_id"])
+                        pairs.append((r["node_id"], c["crew_id"]))
+                        break
+            if pairs:
+                return {"action": "assign_repair_crew",
+                        "arguments": {"node_ids": [n for n, _ in pairs], "crew_ids": [c for _, c in pairs]},
+                        "next_state": "FINAL", "thought": "Assigning crews by criticality, then population."}
+        return {"action": "none", "arguments": {}, "next_state": "FINAL", "thought": "Nothing left to do."}
+
+
+class CachedBackend(LLMBackend):
+    """
+    Wraps another backend with a DecisionCache: an identical (system prompt, context, model settings)
+    request is answered from the cache instead of going back to the model.
+    """
+
+    def __init__(self, inner: LLMBackend, cache: DecisionCache):
+        super().__init__(max_retries=0)
+        self.inner = inner
+        self.cache = cache
+        self.name = inner.name
+
+    def settings(self) -> Dict:
+        return self.inner.settings()
+
+    def complete(self, system_prompt: str, user_context: str, stats: Optional[Dict] = None) -> Dict:
+        key = fingerprint(system_prompt, user_context, self.settings())
+        decision = self.cache.get(key)
+        if decision is None:
+            decision = self.inner.complete(system_prompt, user_context, stats)
+            self.cache.put(key, decision)
+        elif stats is not None:
+            stats.update({"latency_s": 0.0, "cache_hit": True})
+        return decision
+
+    def complete_streaming(self, system_prompt: str, user_context: str,
+                           on_action: Optional[Callable[[Dict], None]] = None,
+                           stats: Optional[Dict] = None) -> Dict:
+        key = fingerprint(system_prompt, user_context, self.settings())
+        decision = self.cache.get(key)
+        if decision is None:
+            stats = stats if stats is not None else {}
+            decision = self.inner.complete_streaming(system_prompt, user_context, on_action, stats)
+            # Μια απάντηση που κόπηκε (το tool έτρεξε ήδη) δεν μπαίνει στην cache, ούτε στον δίσκο
+            if not stats.get("partial") and all(k in decision for k in REQUIRED_FIELDS):
+                self.cache.put(key, decision)
+            return decision
+        if stats is not None:
+            stats.update({"latency_s": 0.0, "cache_hit": True})
+        if on_action is not None:
+            on_action(dict(decision))
+        return decision
+
+    def close(self):
+        self.inner.close()
+
+
+_BACKEND = None
+_BACKEND_LOCK = threading.Lock()
+
+
+def make_backend(kind: Optional[str] = None, cache: Optional[bool] = None, **kwargs) -> LLMBackend:
+    """
+    Builds a new backend. kind: 'cloud' | 'ollama' | 'local' (None = from config.USE_CLOUD).
+    cache: wrap it in the shared DecisionCache (None = from config.LLM_CACHE).
+    Extra keyword arguments go to the backend class (e.g. latency/script for 'local').
+    """
+    if kind is None:
+        kind = "cloud" if config.USE_CLOUD else "ollama"
+    opts = {"timeout": config.LLM_TIMEOUT, "max_retries": config.LLM_MAX_RETRIES, "backoff": config.LLM_BACKOFF,
+            **kwargs}
+    if kind == "cloud":
+        backend = OpenAIBackend(config.CLOUD_API_KEY, config.CLOUD_MODEL, provider=config.CLOUD_PROVIDER,
+                                pool_size=config.LLM_POOL_SIZE, **opts)
+    elif kind == "ollama":
+        backend = OllamaBackend(config.OLLAMA_MODEL, host=config.OLLAMA_HOST, pool_size=config.LLM_POOL_SIZE, **opts)
+    elif kind == "local":
+        backend = LocalBackend(**kwargs)
+    else:
+        raise ValueError(f"Unknown LLM backend '{kind}'")
+    if config.LLM_CACHE if cache is None else cache:
+        backend = CachedBackend(backend, get_cache(config.LLM_CACHE_PATH, max_entries=config.LLM_CACHE_MAX_ENTRIES,
+                                                   ttl=config.LLM_CACHE_TTL))
+    return backend
+
+
+def get_backend() -> LLMBackend:
+    """Returns the process-wide shared backend (built once, on first use)."""
+    global _BACKEND
+    if _BACKEND is None:
+        with _BACKEND_LOCK:
+            if _BACKEND is None:
+                _BACKEND = make_backend()
+    return _BACKEND
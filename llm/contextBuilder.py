@@ -0,0 +1,224 @@
+import json
+from typing import Dict, List, Optional, Tuple
+
+from tools.solver import priority_key
+
+PROMPT_HEADER = """
+            You are an Autonomous Infrastructure Failure Management Agent.
+            GOAL: Analyze infrastructure failures and assign the best available repair crews based on criticality.
+            """
+
+TOOLS = {
+    "detect_failure_nodes": "detect_failure_nodes() -> list: Returns broken node IDs.",
+    "estimate_impact": "estimate_impact(node_id: str) -> dict: Returns impact metrics (population, criticality).",
+    "estimate_impacts": "estimate_impacts(node_ids: list) -> dict: Impact metrics of many nodes at once, keyed by node ID.",
+    "assign_repair_crew": "assign_repair_crew(node_ids: list, crew_ids: list) -> dict: Assigns crews to nodes.",
+    "check_crew_availability": "check_crew_availability() -> Dict: Crew IDs mapped to their current status ('Available' or 'Busy').",
+    "none": "none: Use this if you just want to change state without calling a tool.",
+}
+
+# Ποια tools χρειάζεται να δει το μοντέλο σε κάθε state (στο compact prompt)
+STATE_TOOLS = {
+    "DETECT": ["detect_failure_nodes", "none"],
+    "ANALYZE": ["estimate_impacts", "estimate_impact", "none"],
+    "PLAN": ["assign_repair_crew", "check_crew_availability", "none"],
+    "WAIT": ["check_crew_availability", "none"],
+}
+
+PLANNING_RULES = """
+            RULES FOR PLANNING:
+            - You must match available crews to nodes.
+            - 'General' crews can fix anything. Specialized crews only fix their type ('Electrical' crews fix 'Power' nodes).
+            - Only assign a crew to a node it can fix (compare the crew's 'specialty' with the node's 'type').
+            - Prioritize 'Critical' nodes over 'High/Medium/Low'.
+            - CRITICAL PRIORITY: If multiple nodes are broken, you MUST compare their population. ALWAYS prioritize fixing the node with the HIGHEST population first.
+            """
+
+RESPONSE_FORMAT = """
+            RESPONSE FORMAT:
+            You must respond ONLY with a valid JSON object containing, in this order:
+            - "action": The name of the tool to call.
+            - "arguments": A dictionary of arguments for the tool.
+            - "next_state": The next state to transition to (DETECT, ANALYZE, PLAN, ACT, WAIT, FINAL).
+            - "thought": Explain your reasoning (Chain-of-Thought), last.
+            """
+
+TRUNCATED_MARKER = "... (+{} more)"
+
+# State-specific dynamic instructions to help the small model
+STATE_GUIDANCE = {
+    "DETECT": "CURRENT STATE: DETECT. You MUST call 'detect_failure_nodes' to identify issues. Do NOT transition to FINAL yet.",
+    "ANALYZE": "CURRENT STATE: ANALYZE. You MUST call 'estimate_impacts' with ALL node IDs from 'remaining_to_analyze' (or with an empty 'node_ids' list, which means all of them) and transition to PLAN. If 'remaining_to_analyze' is empty, transition to PLAN.",
+    "PLAN": "CURRENT STATE: PLAN. You MUST call 'assign_repair_crew' to fix 'failed_nodes'. If all nodes are assigned or no crews are available, transition to FINAL.",
+    "WAIT": "CURRENT STATE: WAIT. No action needed. If no actions are available, Trasnition to FINAL."
+}
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token), good enough to compare prompt sizes."""
+    return len(text) // 4 + 1
+
+
+def _tools_section(names: List[str]) -> str:
+    lines = "\n".join(f"            {i}. {TOOLS[n]}" for i, n in enumerate(names, 1))
+    return f"\n            AVAILABLE TOOLS:\n{lines}\n"
+
+
+class ContextBuilder:
+    """
+    Builds the (system prompt, user context) pair of one agent step.
+
+    Compact mode sends only the tools/rules the current state needs, serializes the context without
+    whitespace, keeps observations only for the last `recent_steps` steps (older ones become one-line
+    summaries), replaces observations that repeat data already in the context ('failed_nodes',
+    'impact_reports') with references, and, if a token budget is set, shrinks the context until it fits
+    (history first, then impact reports that cannot get a crew anyway, then long ID lists, then the
+    lowest-priority impact reports). If even that does not fit, the stats report over_budget.
+    measure_savings also serializes the full (uncompacted) context every step to report the tokens saved.
+    """
+
+    def __init__(self, token_budget: Optional[int] = None, compact: bool = True, recent_steps: int = 2,
+                 measure_savings: bool = False):
+        self.token_budget = token_budget
+        self.compact = compact
+        self.recent_steps = recent_steps
+        self.measure_savings = measure_savings
+
+    def full_system_prompt(self, state: str) -> str:
+        return (PROMPT_HEADER + _tools_section(list(TOOLS)) + PLANNING_RULES + RESPONSE_FORMAT
+                + "\n" + STATE_GUIDANCE.get(state, ""))
+
+    def system_prompt(self, state: str) -> str:
+        if not self.compact:
+            return self.full_system_prompt(state)
+        rules = PLANNING_RULES if state == "PLAN" else ""
+        prompt = (PROMPT_HEADER + _tools_section(STATE_TOOLS.get(state, ["none"])) + rules + RESPONSE_FORMAT
+                  + "\n" + STATE_GUIDANCE.get(state, ""))
+        # χωρίς την εσοχή των triple-quoted strings (είναι μόνο κενά που πληρώνουμε σε tokens)
+        return "\n".join(line.strip() for line in prompt.strip().splitlines())
+
+    def _compact_history(self, history: List[Dict], context_data: Dict, recent_steps: int) -> List:
+        failed = context_data.get("failed_nodes", [])
+        reported = {r.get("node_id") for r in context_data.get("impact_reports", [])}
+        result = []
+        previous: Dict[str, object] = {}
+        cutoff = len(history) - recent_steps
+        for i, entry in enumerate(history):
+            action, observation = entry.get("action"), entry.get("observation")
+            if i < cutoff:
+                # Παλιά βήματα: μόνο μία γραμμή περίληψη
+                result.append(f"step {entry.get('step')}: {action} -> {entry.get('state')}")
+                previous[action] = observation
+                continue
+            if observation == previous.get(action):
+                delta = "unchanged"
+            elif action == "detect_failure_nodes" and observation == failed:
+                delta = f"{len(observation)} node(s), see failed_nodes"
+            elif action == "estimate_impact" and observation.get("node_id") in reported:
+                delta = "see impact_reports"
+            elif action == "estimate_impacts" and reported.issuperset(observation):
+                delta = f"{len(observation)} report(s), see impact_reports"
+            else:
+                delta = observation
+            previous[action] = observation
+            result.append({"step": entry.get("step"), "state": entry.get("state"), "action": action,
+                           "observation": delta})
+        return result
+
+    @staticmethod
+    def _dumps(data: Dict) -> str:
+        return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+    def _fit(self, data: Dict, history: List[Dict], budget: int) -> str:
+        text = self._dumps(data)
+        # 1) όλο το history σε περίληψη, 2) μόνο τα τελευταία βήματα, 3) κόψιμο μεγάλων λιστών
+        if estimate_tokens(text) > budget and history:
+            data["past_actions"] = self._compact_history(history, data, 0)
+            text = self._dumps(data)
+        while estimate_tokens(text) > budget and len(data["past_actions"]) > 1:
+            data["past_actions"] = data["past_actions"][len(data["past_actions"]) // 2:]
+            text = self._dumps(data)
+        # Δεν μπορούν να ανατεθούν περισσότεροι κόμβοι από τα διαθέσιμα crews: κρατάμε τους σημαντικότερους
+        reports, crews = data.get("impact_reports", []), data.get("available_crews", [])
+        if estimate_tokens(text) > budget and len(reports) > len(crews):
+            data["impact_reports"] = sorted(reports, key=priority_key, reverse=True)[:max(len(crews), 1)]
+            text = self._dumps(data)
+        for key in ("failed_nodes", "remaining_to_analyze", "available_crews"):
+            values = data.get(key)
+            if not isinstance(values, list):
+                continue
+            keep = len(values)
+            while estimate_tokens(text) > budget and keep > 1:
+                keep //= 2
+                data[key] = values[:keep] + [TRUNCATED_MARKER.format(len(values) - keep)]
+                text = self._dumps(data)
+        # Τελευταίο βήμα: λιγότερα impact reports (οι σημαντικότεροι κόμβοι μένουν, τα crews απλώς περιμένουν)
+        reports = data.get("impact_reports", [])
+        if estimate_tokens(text) > budget and len(reports) > 1:
+            reports = sorted(reports, key=priority_key, reverse=True)
+            keep = len(reports)
+            while estimate_tokens(text) > budget and keep > 1:
+                keep //= 2
+                data["impact_reports"] = reports[:keep] + [TRUNCATED_MARKER.format(len(reports) - keep)]
+                text = self._dumps(data)
+        return text
+
+    def build_explain(self, system_prompt: str, context_data: Dict, plan: Dict) -> Tuple[str, Dict]:
+        """
+        User context of the call that explains a solver plan: the plan, the impact reports of the planned
+        nodes only and no history, shrunk to the token budget like a step context.
+
+        Returns:
+            Tuple[str, Dict]: user context and prompt size stats (as in build, without the savings).
+        """
+        planned = set(plan.get("node_ids", []))
+        data = {
+            "current_state": context_data.get("current_state"),
+            "past_actions": [],
+            "failed_nodes": context_data.get("failed_nodes", []),
+            "impact_reports": [r for r in context_data.get("impact_reports", []) if r.get("node_id") in planned],
+            "available_crews": context_data.get("available_crews", []),
+            "plan": plan,
+        }
+        if self.token_budget is not None:
+            user_context = self._fit(data, [], max(self.token_budget - estimate_tokens(system_prompt), 0))
+        else:
+            user_context = self._dumps(data)
+        stats = {"system_tokens": estimate_tokens(system_prompt), "context_tokens": estimate_tokens(user_context)}
+        stats["total_tokens"] = stats["system_tokens"] + stats["context_tokens"]
+        if self.token_budget is not None:
+            stats["over_budget"] = stats["total_tokens"] > self.token_budget
+        return user_context, stats
+
+    def build(self, state: str, context_data: Dict) -> Tuple[str, str, Dict]:
+        """
+        Args:
+            state (str): Current agent state ('DETECT', 'ANALYZE', ...).
+            context_data (Dict): Full context; 'past_actions' holds the raw history entries.
+
+        Returns:
+            Tuple[str, str, Dict]: system prompt, user context and prompt size stats
+            (system_tokens, context_tokens, total_tokens, over_budget when a budget is set and, if
+            measured, full_tokens / saved_tokens).
+        """
+        system_prompt = self.system_prompt(state)
+        if self.compact:
+            data = dict(context_data)
+            history = context_data.get("past_actions", [])
+            data["past_actions"] = self._compact_history(history, data, self.recent_steps)
+            if self.token_budget is not None:
+                user_context = self._fit(data, history, max(self.token_budget - estimate_tokens(system_prompt), 0))
+            else:
+                user_context = self._dumps(data)
+        else:
+            user_context = json.dumps(context_data, indent=2)
+
+        stats = {"system_tokens": estimate_tokens(system_prompt), "context_tokens": estimate_tokens(user_context)}
+        stats["total_tokens"] = stats["system_tokens"] + stats["context_tokens"]
+        if self.token_budget is not None:
+            stats["over_budget"] = stats["total_tokens"] > self.token_budget
+        if self.measure_savings:
+            full = estimate_tokens(self.full_system_prompt(state)) + estimate_tokens(json.dumps(context_data, indent=2))
+            stats["full_tokens"] = full
+            stats["saved_tokens"] = full - stats["total_tokens"]
+        return system_prompt, user_context, stats
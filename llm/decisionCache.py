@@ -0,0 +1,134 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+
+def fingerprint(system_prompt: str, user_context: str, settings: Dict) -> str:
+    """
+    Canonical hash of one LLM request. The context is re-serialized with sorted keys and
+    compact separators, so formatting differences (indent, key order) map to the same key.
+    """
+    try:
+        context = json.loads(user_context)
+    except ValueError:
+        context = user_context
+    canonical = json.dumps({"system": system_prompt.strip(), "context": context, "settings": settings},
+                           sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class DecisionCache:
+    """
+    LRU cache of LLM decisions with an optional TTL and an optional on-disk (sqlite) backend.
+
+    Με path=None ζει μόνο στη μνήμη. Με path, οι αποφάσεις επιβιώνουν ανάμεσα σε runs/processes
+    και η μνήμη κρατάει μόνο ένα LRU αντίγραφο των πιο πρόσφατων.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_entries: int = 1024, ttl: Optional[float] = None):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False, timeout=30)
+            self._db.execute("CREATE TABLE IF NOT EXISTS decisions "
+                             "(key TEXT PRIMARY KEY, created REAL, last_used REAL, decision TEXT)")
+            self._db.commit()
+
+    def _expired(self, created: float) -> bool:
+        return self.ttl is not None and time.time() - created > self.ttl
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None and self._db is not None:
+                row = self._db.execute("SELECT created, decision FROM decisions WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    entry = (row[0], json.loads(row[1]))
+            if entry is None or self._expired(entry[0]):
+                if entry is not None:
+                    self._delete(key)
+                self.misses += 1
+                return None
+            self._remember(key, entry)
+            if self._db is not None:
+                self._db.execute("UPDATE decisions SET last_used = ? WHERE key = ?", (time.time(), key))
+                self._db.commit()
+            self.hits += 1
+            # αντίγραφο, ώστε ο agent να μη μπορεί να αλλάξει την αποθηκευμένη απόφαση
+            return json.loads(json.dumps(entry[1]))
+
+    def put(self, key: str, decision: Dict):
+        with self._lock:
+            now = time.time()
+            self._remember(key, (now, decision))
+            if self._db is not None:
+                self._db.execute("INSERT OR REPLACE INTO decisions VALUES (?, ?, ?, ?)",
+                                 (key, now, now, json.dumps(decision, ensure_ascii=False)))
+                count = self._db.execute("SELECT COUNT(*) FROM decisions").fetchone()[0]
+                if count > self.max_entries:
+                    self._db.execute("DELETE FROM decisions WHERE key IN "
+                                     "(SELECT key FROM decisions ORDER BY last_used LIMIT ?)",
+                                     (count - self.max_entries,))
+                    self.evictions += count - self.max_entries
+                self._db.commit()
+
+    def _remember(self, key: str, entry: tuple):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            if self._db is None:
+                self.evictions += 1
+
+    def _delete(self, key: str):
+        self._memory.pop(key, None)
+        if self._db is not None:
+            self._db.execute("DELETE FROM decisions WHERE key = ?", (key,))
+            self._db.commit()
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM decisions")
+                self._db.commit()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            total = self.hits + self.misses
+            size = len(self._memory)
+            if self._db is not None:
+                size = self._db.execute("SELECT COUNT(*) FROM decisions").fetchone()[0]
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "size": size,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0}
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+_CACHES: Dict[Optional[str], DecisionCache] = {}
+_CACHES_LOCK = threading.Lock()
+
+
+def get_cache(path: Optional[str] = None, max_entries: int = 1024, ttl: Optional[float] = None) -> DecisionCache:
+    """Returns the process-wide cache for `path`, so every agent in the process shares one set of counters."""
+    with _CACHES_LOCK:
+        if path not in _CACHES:
+            _CACHES[path] = DecisionCache(path, max_entries=max_entries, ttl=ttl)
+        return _CACHES[path]
@@ -0,0 +1,97 @@
+import json
+from typing import Dict
+
+
+class IncrementalJSONParser:
+    """
+    Parses a streamed JSON object chunk by chunk and exposes every top-level field as soon as its
+    value is complete, e.g. 'action' and 'arguments' long before the model finishes its 'thought'.
+
+    Text before the first '{' (such as a markdown ```json fence) is skipped. Each character is
+    scanned once, so the cost of feed() is linear in the size of the chunk.
+    """
+
+    def __init__(self):
+        self.fields: Dict = {}
+        self.done = False
+        self._buf = []
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._expect = "key"       # key -> colon -> value -> comma
+        self._key = None
+        self._token_start = None   # αρχή του τρέχοντος key/value (στο depth 1)
+        self._primitive = False    # number / true / false / null, τελειώνει μόνο σε ',' ή '}'
+
+    def has(self, *keys: str) -> bool:
+        return all(k in self.fields for k in keys)
+
+    def _text(self, start: int, end: int) -> str:
+        return "".join(self._buf[start:end])
+
+    def _finish_value(self, end: int):
+        try:
+            self.fields[self._key] = json.loads(self._text(self._token_start, end))
+        except ValueError:
+            pass
+        self._token_start = None
+        self._primitive = False
+        self._expect = "comma"
+
+    def feed(self, chunk: str):
+        self._buf.extend(chunk)
+        buf = self._buf
+        for pos in range(self._pos, len(buf)):
+            if self.done:
+                break
+            ch = buf[pos]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        if self._expect == "key":
+                            self._key = json.loads(self._text(self._token_start, pos + 1))
+                            self._token_start = None
+                            self._expect = "colon"
+                        elif self._expect == "value":
+                            self._finish_value(pos + 1)
+                continue
+
+            if self._depth == 0 and ch != "{":
+                continue
+            if ch == '"':
+                self._in_string = True
+                if self._depth == 1 and self._expect in ("key", "value"):
+                    self._token_start = pos
+            elif ch in "{[":
+                if self._depth == 1 and self._expect == "value":
+                    self._token_start = pos
+                self._depth += 1
+            elif ch in "}]":
+                if self._depth == 1 and self._primitive:
+                    self._finish_value(pos)
+                self._depth -= 1
+                if self._depth == 1 and self._expect == "value" and self._token_start is not None:
+                    self._finish_value(pos + 1)
+                elif self._depth == 0:
+                    self.done = True
+            elif self._depth == 1:
+                if ch == ",":
+                    if self._primitive:
+                        self._finish_value(pos)
+                    self._expect = "key"
+                elif ch == ":" and self._expect == "colon":
+                    self._expect = "value"
+                elif not ch.isspace() and self._expect == "value" and not self._primitive:
+                    self._token_start = pos
+                    self._primitive = True
+        self._pos = len(buf)
+
+    @property
+    def text(self) -> str:
+        return "".join(self._buf)
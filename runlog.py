@@ -0,0 +1,171 @@
+import atexit
+import gzip
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Union
+
+# Επίπεδα λεπτομέρειας: ό,τι είναι κάτω από το όριο δεν μορφοποιείται καν
+DEBUG, INFO, DECISION, WARNING = 10, 20, 25, 30
+OFF = 100
+LEVELS = {"debug": DEBUG, "info": INFO, "decision": DECISION, "warning": WARNING, "off": OFF}
+LEVEL_NAMES = {v: k for k, v in LEVELS.items()}
+
+BATCH_SIZE = 512  # μέγιστος αριθμός εγγραφών ανά write του background thread
+
+
+def parse_level(level: Union[str, int, None]) -> int:
+    """'debug' | 'info' | 'decision' | 'warning' | 'off' | an int; None means off."""
+    if level is None:
+        return OFF
+    if isinstance(level, int):
+        return level
+    try:
+        return LEVELS[level.lower()]
+    except KeyError:
+        raise ValueError(f"Unknown log level '{level}' (expected one of {tuple(LEVELS)})") from None
+
+
+class _Writer:
+    """
+    One background thread per process that does all the log I/O. Agents only put records on a queue;
+    the thread takes whatever has accumulated (up to BATCH_SIZE records) and writes it with one call per file.
+    """
+
+    _CLOSE, _FLUSH = object(), object()
+
+    def __init__(self):
+        self._reset()
+
+    def _reset(self):
+        # Και στο child μετά από fork: το thread του parent δεν υπάρχει εκεί, ξεκινά νέο στην πρώτη εγγραφή
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="runlog-writer", daemon=True)
+                    self._thread.start()
+
+    def write(self, target, text: str):
+        self._ensure_started()
+        self._queue.put((target, text))
+
+    def _control(self, op, target) -> threading.Event:
+        self._ensure_started()
+        done = threading.Event()
+        self._queue.put((op, (target, done)))
+        return done
+
+    def close(self, target, timeout: Optional[float] = None):
+        self._control(self._CLOSE, target).wait(timeout)
+
+    def flush(self, timeout: Optional[float] = None):
+        if self._thread is not None:
+            self._control(self._FLUSH, None).wait(timeout)
+
+    @staticmethod
+    def _write_out(pending: Dict, target=None):
+        for t in ([target] if target is not None else list(pending)):
+            chunks = pending.pop(t, None)
+            if not chunks:
+                continue
+            try:
+                t.write("".join(chunks))
+                if t is sys.stdout or t is sys.stderr:
+                    t.flush()
+            except (OSError, ValueError) as e:
+                print(f"[RUNLOG] write failed: {e}", file=sys.stderr)
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            try:
+                while len(batch) < BATCH_SIZE:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                pass
+            pending: Dict[object, List[str]] = {}
+            for target, payload in batch:
+                if target is self._CLOSE:
+                    handle, done = payload
+                    self._write_out(pending, handle)
+                    try:
+                        handle.close()
+                    except OSError as e:
+                        print(f"[RUNLOG] close failed: {e}", file=sys.stderr)
+                    done.set()
+                elif target is self._FLUSH:
+                    self._write_out(pending)
+                    payload[1].set()
+                else:
+                    pending.setdefault(target, []).append(payload)
+            self._write_out(pending)
+
+
+_writer = _Writer()
+atexit.register(_writer.flush, 5.0)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_writer._reset)
+
+
+class RunLogger:
+    """
+    Structured, buffered log of one agent run. Records go to a per-agent file (plain text or JSONL,
+    optionally gzip-compressed) and/or the terminal through the shared background writer, so the
+    agent never blocks on I/O. Records below `level` (file) / `console_level` (terminal) are dropped;
+    callers use enabled() to skip building expensive messages such as prompt dumps.
+    """
+
+    def __init__(self, path: Optional[str] = None, level: Union[str, int, None] = INFO,
+                 console_level: Union[str, int, None] = INFO, fmt: str = "text", compress: bool = False,
+                 name: str = "agent"):
+        if fmt not in ("text", "jsonl"):
+            raise ValueError(f"Unknown log format '{fmt}' (expected 'text' or 'jsonl')")
+        self.name = name
+        self.fmt = fmt
+        self.level = parse_level(level) if path else OFF
+        self.console_level = parse_level(console_level)
+        self.path = None
+        self._file = None
+        if self.level < OFF:  # με το log off δεν μένει πίσω κενό αρχείο
+            self.path = path + ".gz" if compress and not path.endswith(".gz") else path
+            if compress:
+                self._file = gzip.open(self.path, "wt", encoding="utf-8")
+            else:
+                self._file = open(self.path, "w", encoding="utf-8", buffering=1 << 16)
+
+    def enabled(self, level: int) -> bool:
+        return level >= self.level or level >= self.console_level
+
+    def log(self, message: str = "", level: int = INFO, kind: str = "message", step: Optional[int] = None,
+            **fields):
+        if level >= self.console_level:
+            _writer.write(sys.stdout, message + "\n")
+        if level >= self.level and self._file is not None:
+            if self.fmt == "jsonl":
+                record = {"ts": round(time.time(), 6), "run": self.name, "step": step,
+                          "level": LEVEL_NAMES.get(level, level), "kind": kind, **fields}
+                if message and not fields:  # οι δομημένες εγγραφές έχουν ήδη τα δεδομένα τους στα fields
+                    record["message"] = message.strip()
+                line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+            else:
+                line = message + "\n"
+            _writer.write(self._file, line)
+
+    def flush(self, timeout: Optional[float] = None):
+        _writer.flush(timeout)
+
+    def close(self, timeout: Optional[float] = 10.0):
+        """Waits until every queued record of this logger is written, then closes the file."""
+        if self._file is not None:
+            _writer.close(self._file, timeout)
+            self._file = None
+        elif self.console_level < OFF:
+            _writer.flush(timeout)
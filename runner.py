@@ -0,0 +1,148 @@
+import argparse
+import asyncio
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Dict, List, Optional
+
+import config
+from scenarios import jsonPicker
+
+MODES = ("async", "thread", "process")
+
+
+def _make_agent(scenario_path: str, max_steps: int, backend_kind: Optional[str], cache: Optional[bool],
+                agent_opts: Dict):
+    import core
+    from llm.backends import make_backend
+
+    scenario_name = os.path.basename(scenario_path)
+    print(f"\n{'▬'*50}\nRUNNING SCENARIO: {scenario_name}\n{'▬'*50}")
+    world_state = jsonPicker.load_world(scenario_path)
+    backend = make_backend(backend_kind, cache=cache) if backend_kind or cache is not None else None
+    return core.InfrastructureAgent(world_state, max_steps=max_steps, backend=backend, **agent_opts)
+
+
+def _summary(scenario_path: str, agent, t0: float, log: str) -> Dict:
+    return {"scenario": os.path.basename(scenario_path), "steps": agent.step_count, "final_state": agent.state.value,
+            "llm_calls": agent.llm_calls, "duration_s": round(time.perf_counter() - t0, 3), "log": log}
+
+
+def run_scenario(scenario_path: str, max_steps: int = 15, step_delay: float = 1.0,
+                 backend_kind: Optional[str] = None, cache: Optional[bool] = None, **agent_opts) -> Dict:
+    """
+    Runs one scenario to completion inside the current process.
+    Extra keyword arguments (planner, streaming, trace_formats, ...) go to InfrastructureAgent.
+
+    Returns:
+        Dict: Summary of the run (scenario, steps, final_state, llm_calls, duration_s, log).
+    """
+    agent = _make_agent(scenario_path, max_steps, backend_kind, cache, agent_opts)
+    t0 = time.perf_counter()
+    log = agent.run(step_delay=step_delay, log_name=os.path.splitext(os.path.basename(scenario_path))[0])
+    return _summary(scenario_path, agent, t0, log)
+
+
+async def _arun_scenario(scenario_path: str, semaphore: asyncio.Semaphore, max_steps: int = 15,
+                         step_delay: float = 1.0, backend_kind: Optional[str] = None,
+                         cache: Optional[bool] = None, **agent_opts) -> Dict:
+    async with semaphore:
+        # Η φόρτωση του σεναρίου (μπορεί να είναι μεγάλο) σε thread, ώστε να μην μπλοκάρει τους άλλους agents
+        agent = await asyncio.to_thread(_make_agent, scenario_path, max_steps, backend_kind, cache, agent_opts)
+        t0 = time.perf_counter()
+        log = await agent.arun(step_delay=step_delay, log_name=os.path.splitext(os.path.basename(scenario_path))[0])
+        return _summary(scenario_path, agent, t0, log)
+
+
+async def run_scenarios_async(scenario_paths: List[str], concurrency: int = 4, mode: str = "async",
+                              **kwargs) -> List[Dict]:
+    """
+    Runs many scenarios at once, at most `concurrency` at a time.
+
+    mode: 'async'   -> coroutines in this event loop (LLM calls run in worker threads),
+          'thread'  -> ThreadPoolExecutor,
+          'process' -> ProcessPoolExecutor (one interpreter per worker).
+    Κάθε agent έχει δικό του world state, οπότε όλα τα modes μπορούν να μοιραστούν το ίδιο interpreter.
+    Ο συνολικός χρόνος καθορίζεται από το πιο αργό σενάριο (ανά worker) και όχι από το άθροισμα.
+    A failed scenario is reported with an 'error' entry instead of aborting the sweep.
+    """
+    if mode == "async":
+        semaphore = asyncio.Semaphore(concurrency)
+        results = await asyncio.gather(*(_arun_scenario(p, semaphore, **kwargs) for p in scenario_paths),
+                                       return_exceptions=True)
+    elif mode in ("thread", "process"):
+        loop = asyncio.get_running_loop()
+        executor_cls = ThreadPoolExecutor if mode == "thread" else ProcessPoolExecutor
+        with executor_cls(max_workers=concurrency) as pool:
+            futures = [loop.run_in_executor(pool, partial(run_scenario, p, **kwargs)) for p in scenario_paths]
+            results = await asyncio.gather(*futures, return_exceptions=True)
+    else:
+        raise ValueError(f"Unknown runner mode '{mode}' (expected one of {MODES})")
+    return [r if not isinstance(r, BaseException) else {"scenario": os.path.basename(p), "error": repr(r)}
+            for p, r in zip(scenario_paths, results)]
+
+
+def print_summary(results: List[Dict], elapsed: float):
+    print(f"\n{'='*50}\nSWEEP SUMMARY ({len(results)} scenarios, {elapsed:.2f}s)\n{'='*50}")
+    for r in results:
+        if "error" in r:
+            print(f"{r['scenario']:<28} ERROR {r['error']}")
+        else:
+            print(f"{r['scenario']:<28} steps={r['steps']:<3} llm_calls={r['llm_calls']:<3} "
+                  f"final={r['final_state']:<8} {r['duration_s']:.2f}s")
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Run every scenarios/scenario_*.json through the agent.")
+    parser.add_argument("--concurrency", type=int, default=1, help="scenarios running at once (1 = one after another)")
+    parser.add_argument("--mode", choices=MODES, default="async", help="how concurrent scenarios are executed")
+    parser.add_argument("--max-steps", type=int, default=15)
+    parser.add_argument("--step-delay", type=float, default=1.0, help="seconds to sleep between steps")
+    parser.add_argument("--backend", choices=["cloud", "ollama", "local"], default=None,
+                        help="LLM backend (default: from config.USE_CLOUD)")
+    parser.add_argument("--planner", choices=["llm", "greedy", "optimal"], default="llm",
+                        help="who computes the crew assignment in PLAN")
+    parser.add_argument("--cache", action="store_true", default=None,
+                        help="answer repeated (prompt, context) pairs from the decision cache")
+    parser.add_argument("--stream", action="store_true",
+                        help="stream LLM responses and start tools as soon as the action is parsed")
+    parser.add_argument("--trace", choices=["none", "jsonl", "chrome", "both"], default=None,
+                        help="per-step trace export next to each run log (default: config.TRACE_FORMATS)")
+    parser.add_argument("--log-level", choices=["debug", "info", "decision", "warning", "off"], default=None,
+                        help="run log verbosity ('decision' drops the prompt dumps; default: config.LOG_LEVEL)")
+    parser.add_argument("--console-level", choices=["debug", "info", "decision", "warning", "off"], default=None,
+                        help="terminal verbosity (default: config.LOG_CONSOLE_LEVEL)")
+    parser.add_argument("--log-format", choices=["text", "jsonl"], default=None)
+    parser.add_argument("--log-compress", action="store_true", default=None, help="gzip the run logs")
+    parser.add_argument("--seed", type=int, default=config.seed_int, help="RNG seed of the simulation (repair durations)")
+    args = parser.parse_args(argv)
+    if args.backend is None:
+        # Πρώτη εκτέλεση χωρίς llm_config.json: ερώτηση cloud/local (μόνο εδώ, όχι στο import του config)
+        config.interactive_setup()
+
+    scenario_files = jsonPicker.get_available_scenarios()
+    print(f"Found {len(scenario_files)} scenarios to run.")
+    opts = {"max_steps": args.max_steps, "step_delay": args.step_delay, "backend_kind": args.backend,
+            "planner": args.planner, "cache": args.cache,
+            "streaming": args.stream, "seed": args.seed, "log_level": args.log_level,
+            "console_level": args.console_level, "log_format": args.log_format, "log_compress": args.log_compress}
+    if args.trace is not None:
+        opts["trace_formats"] = {"none": (), "jsonl": ("jsonl",), "chrome": ("chrome",),
+                                 "both": ("jsonl", "chrome")}[args.trace]
+
+    t0 = time.perf_counter()
+    if args.concurrency > 1:
+        results = asyncio.run(run_scenarios_async(scenario_files, concurrency=args.concurrency,
+                                                  mode=args.mode, **opts))
+    else:
+        results = [run_scenario(p, **opts) for p in scenario_files]
+    print_summary(results, time.perf_counter() - t0)
+    if args.cache and args.mode != "process":
+        from llm.decisionCache import get_cache
+        print(f"Decision cache: {get_cache(config.LLM_CACHE_PATH).stats()}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import argparse
+import json
+import os
+import random
+import sys
+from typing import Dict, Optional
+
+if not __package__:
+    # python scenarios/generator.py: το root του project στο path για τα imports παρακάτω
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scenarios.snapshot import SNAPSHOT_EXT, save_snapshot
+from tools.worldState import WorldState
+
+NODE_TYPES = ["Power", "Water", "Telecom", "Internet"]
+SPECIALTIES = ["General", "Electrical", "Water", "Telecom"]
+CRITICALITIES = ["Critical", "High", "Medium", "Low"]
+
+
+def generate_scenario(n_nodes: int, n_crews: Optional[int] = None, broken_ratio: float = 0.1,
+                      busy_ratio: float = 0.2, seed: int = 0) -> Dict:
+    """
+    Builds a synthetic scenario in the same layout as scenarios/scenario_*.json.
+
+    Args:
+        n_nodes (int): Number of nodes (10 ... 100k+).
+        n_crews (int): Number of crews (default: 1 per 100 nodes, at least 2).
+        broken_ratio (float): Fraction of nodes that start 'Broken'.
+        busy_ratio (float): Fraction of crews that start 'Busy'.
+        seed (int): RNG seed, the same arguments always give the same scenario.
+
+    Returns:
+        Dict: {"nodes": {...}, "crews": {...}}
+    """
+    rng = random.Random(seed)
+    if n_crews is None:
+        n_crews = max(2, n_nodes // 100)
+    nodes = {}
+    for i in range(n_nodes):
+        node_type = rng.choice(NODE_TYPES)
+        nodes[f"Node_{node_type}_{i:06d}"] = {
+            "status": "Broken" if rng.random() < broken_ratio else "Operational",
+            "type": node_type,
+            "population_affected": rng.randint(1, 500) * 100,
+            "criticality": rng.choices(CRITICALITIES, weights=[1, 2, 3, 4])[0],
+        }
+    crews = {f"Crew_{i:05d}": {"status": "Busy" if rng.random() < busy_ratio else "Available",
+                               "specialty": rng.choice(SPECIALTIES)}
+             for i in range(n_crews)}
+    return {"nodes": nodes, "crews": crews}
+
+
+def write_scenario(path: str, n_nodes: int, **kwargs) -> str:
+    """Writes a generated scenario as JSON, or as a binary snapshot if `path` ends in .wsnap."""
+    if path.endswith(SNAPSHOT_EXT):
+        return save_snapshot(WorldState.from_dict(generate_scenario(n_nodes, **kwargs)), path)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(generate_scenario(n_nodes, **kwargs), f)
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic scenario JSON file.")
+    parser.add_argument("--nodes", type=int, default=1000)
+    parser.add_argument("--crews", type=int, default=None)
+    parser.add_argument("--broken", type=float, default=0.1, help="fraction of broken nodes")
+    parser.add_argument("--busy", type=float, default=0.2, help="fraction of busy crews")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=None, help="output path, .json or .wsnap (default: generated_<nodes>.json)")
+    args = parser.parse_args()
+    out = args.out or f"generated_{args.nodes}.json"
+    write_scenario(out, args.nodes, n_crews=args.crews, broken_ratio=args.broken, busy_ratio=args.busy, seed=args.seed)
+    print(f"[GENERATOR] {args.nodes} nodes -> {out}")
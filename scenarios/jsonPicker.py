@@ -3,20 +3,199 @@ import sys
 import json
 import os
 import glob
+import re
+from typing import Dict, Iterator, Optional, Tuple, Union
 
-def load_world_state(filename):
+if not __package__:
+    # python scenarios/jsonPicker.py: το root του project στο path για τα imports παρακάτω
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scenarios.snapshot import SNAPSHOT_EXT, is_snapshot, load_snapshot, save_snapshot
+from tools.worldState import WorldState
+
+CHUNK_SIZE = 1 << 20  # 1 MB ανά ανάγνωση στο streaming loader
+# Από αυτό το μέγεθος και πάνω το load_world κάνει streaming (~3x πιο αργό από json.load, αλλά χωρίς
+# το dict όλου του αρχείου στη μνήμη). Τα συνηθισμένα σενάρια φορτώνονται με json.load.
+STREAM_MIN_BYTES = 64 << 20
+_WHITESPACE = re.compile(r"\s*")
+_KEY = re.compile(r'\s*("(?:[^"\\]|\\.)*")\s*:\s*')
+_SEPARATOR = re.compile(r"\s*([,}])")
+_LOOKAHEAD = 1 << 16  # τουλάχιστον τόσοι χαρακτήρες στο buffer πριν από κάθε εγγραφή
+
+
+def _check_exists(filename):
     if not os.path.exists(filename):
-        print(f"[JSONPICKER] Σφάλμα: Το αρχείο {filename} δεν υπάρχει.")
-        sys.exit(1)
+        raise FileNotFoundError(f"[JSONPICKER] Σφάλμα: Το αρχείο {filename} δεν υπάρχει.")
+
+def load_world_state(filename):
+    _check_exists(filename)
     with open(filename, 'r', encoding='utf-8') as f:
         return json.load(f)
 
-def save_world_state(state, filename):
+
+class _JSONStream:
+    """
+    Reads a JSON document from a file chunk by chunk. Only the part not consumed yet stays in memory,
+    so one record at a time is decoded instead of the whole file.
+    """
+
+    def __init__(self, f, chunk_size: int = CHUNK_SIZE):
+        self._f = f
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        chunk = self._f.read(self._chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf) or not self._fill():
+                return self.buf[self.pos:self.pos + 1]
+
+    def expect(self, chars: str) -> str:
+        buf, pos = self.buf, self.pos
+        if pos < len(buf) and buf[pos] in chars:  # συνήθης περίπτωση: χωρίς κενά πριν
+            self.pos = pos + 1
+            return buf[pos]
+        ch = self.peek()
+        if not ch or ch not in chars:
+            raise ValueError(f"Expected one of {chars!r} in the scenario file, found {ch!r}")
+        self.pos += 1
+        return ch
+
+    def value(self):
+        if self.pos >= len(self.buf) or self.buf[self.pos].isspace():
+            self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                # Η τιμή συνεχίζει στο επόμενο chunk
+                if self.eof or not self._fill():
+                    raise
+                continue
+            if end == len(self.buf) and not self.eof and self._fill():
+                continue  # π.χ. αριθμός που μπορεί να κόπηκε στο όριο του chunk
+            self.pos = end
+            return value
+
+    def items(self) -> Iterator[Tuple[str, object]]:
+        """Yields the (key, value) pairs of the object that starts at the current position."""
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        decode = self._decoder.raw_decode
+        while True:
+            if len(self.buf) - self.pos < _LOOKAHEAD and not self.eof:
+                self._fill()
+            buf, pos = self.buf, self.pos
+            # "key": value , ή } με ένα regex + ένα raw_decode ανά εγγραφή
+            try:
+                key = _KEY.match(buf, pos)
+                if key is None:
+                    raise ValueError(f"Expected a key in the scenario file, found {buf[pos:pos + 20]!r}")
+                value, end = decode(buf, key.end())
+                separator = _SEPARATOR.match(buf, end)
+                if separator is None:
+                    raise ValueError(f"Expected ',' or '}}' in the scenario file, found {buf[end:end + 20]!r}")
+            except ValueError:
+                # Η εγγραφή συνεχίζει στο επόμενο chunk (ή το αρχείο είναι πράγματι χαλασμένο)
+                if self.eof or not self._fill():
+                    raise
+                continue
+            self.pos = separator.end()
+            raw_key = key.group(1)
+            yield (json.loads(raw_key) if "\\" in raw_key else raw_key[1:-1]), value
+            if separator.group(1) == "}":
+                return
+
+
+def iter_world_state(filename, chunk_size: int = CHUNK_SIZE) -> Iterator[Tuple[str, str, Dict]]:
+    """
+    Streams a scenario file: yields ('nodes' | 'crews', id, record) one record at a time, without
+    building the dict of the whole file (reading `chunk_size` characters at a time). Other top-level
+    keys are skipped.
+    """
+    _check_exists(filename)
+    with open(filename, 'r', encoding='utf-8') as f:
+        stream = _JSONStream(f, chunk_size)
+        stream.expect("{")
+        if stream.peek() == "}":
+            return
+        while True:
+            section = stream.value()
+            stream.expect(":")
+            if section in ("nodes", "crews"):
+                for record_id, record in stream.items():
+                    yield section, record_id, record
+            else:
+                stream.value()
+            if stream.expect(",}") == "}":
+                return
+
+
+def stream_world_state(filename, seed: Optional[int] = None, chunk_size: int = CHUNK_SIZE) -> WorldState:
+    """Builds a WorldState straight from a (possibly very large) scenario JSON file, record by record."""
+    world = WorldState(seed)
+    for section, record_id, d in iter_world_state(filename, chunk_size):
+        if section == "nodes":
+            world.add_node(record_id, d["status"], d["type"], d["population_affected"], d["criticality"])
+        else:
+            world.add_crew(record_id, d["status"], d["specialty"])
+    return world
+
+
+def load_world(filename, seed: Optional[int] = None) -> WorldState:
+    """
+    Loads a scenario as a WorldState: binary snapshot (.wsnap) via mmap, JSON files of at least
+    STREAM_MIN_BYTES streamed record by record, smaller ones with json.load.
+    """
+    _check_exists(filename)
+    if is_snapshot(filename):
+        return load_snapshot(filename, seed)
+    if os.path.getsize(filename) >= STREAM_MIN_BYTES:
+        return stream_world_state(filename, seed)
+    return WorldState.from_dict(load_world_state(filename), seed=seed)
+
+
+def _write_json_streaming(world: WorldState, f):
+    # Ένας κόμβος ανά γραμμή, χωρίς να φτιαχτεί πρώτα το dict όλου του world state
+    dumps = json.dumps
+    for section, records in (("nodes", world.nodes), ("crews", world.crews)):
+        f.write(('{\n' if section == "nodes" else ',\n') + f'    "{section}": {{')
+        sep = "\n"
+        for record_id, record in records.items():
+            f.write(f'{sep}        {dumps(record_id, ensure_ascii=False)}: {dumps(record.to_dict(), ensure_ascii=False)}')
+            sep = ",\n"
+        f.write("\n    }")
+    f.write("\n}\n")
+
+
+def save_world_state(state: Union[Dict, WorldState], filename):
     # Αποθηκεύει τα αποτελέσματα σε νέο αρχείο 'results_...'
-    result_file = "result_" + filename
-    with open(result_file, 'w', encoding='utf-8') as f:
-        json.dump(state, f, indent=4, ensure_ascii=False)
+    # .wsnap -> binary snapshot, αλλιώς JSON (ένα WorldState γράφεται εγγραφή-εγγραφή)
+    directory, name = os.path.split(filename)
+    result_file = os.path.join(directory, "result_" + name)
+    if filename.endswith(SNAPSHOT_EXT):
+        save_snapshot(state if isinstance(state, WorldState) else WorldState.from_dict(state), result_file)
+    else:
+        with open(result_file, 'w', encoding='utf-8') as f:
+            if isinstance(state, WorldState):
+                _write_json_streaming(state, f)
+            else:
+                json.dump(state, f, indent=4, ensure_ascii=False)
     print(f"[JSONPICKER] Τα αποτελέσματα αποθηκεύτηκαν στο: {result_file}")
+    return result_file
 
 def get_available_scenarios():
     """Επιστρέφει λίστα με τα paths των διαθέσιμων σεναρίων (scenario_*.json)"""
@@ -26,4 +205,8 @@ def get_available_scenarios():
 if __name__ == "__main__":
     SCENARIO_FILE = sys.argv[1] if len(sys.argv) > 1 else "mainscenario.json"
     # Φόρτωση του επιλεγμένου σεναρίου
-    WORLD_STATE = load_world_state(SCENARIO_FILE)
\ No newline at end of file
+    try:
+        WORLD_STATE = load_world(SCENARIO_FILE)
+    except FileNotFoundError as e:
+        print(e)
+        sys.exit(1)
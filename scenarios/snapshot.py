@@ -0,0 +1,146 @@
+import json
+import mmap
+import struct
+import sys
+from array import array
+from typing import Dict, List, Optional
+
+from tools.worldState import WorldState
+
+# Binary columnar snapshot of a WorldState (nodes + crews), reloadable without parsing JSON.
+#
+#   header   : MAGIC, version, n_nodes, n_crews, length of the meta JSON, length of the ID blob
+#   meta     : JSON with the vocabularies (status / type / criticality / specialty names)
+#   ids      : node IDs then crew IDs, UTF-8, '\n' separated
+#   columns  : population (uint32 LE, 8-byte aligned), node status, type, criticality,
+#              crew status, specialty (uint8 codes into the vocabularies)
+SNAPSHOT_EXT = ".wsnap"
+MAGIC = b"WSNAP\x00\x00\x01"
+VERSION = 1
+_HEADER = struct.Struct("<8sIIIII")
+_NODE_COLUMNS = ("status", "type", "criticality")
+_CREW_COLUMNS = ("crew_status", "specialty")
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+def _encode(values: List[str], vocab: Dict[str, int]) -> bytes:
+    codes = bytes(vocab.setdefault(v, len(vocab)) for v in values)
+    if len(vocab) > 256:
+        raise ValueError("Snapshot columns support at most 256 distinct values")
+    return codes
+
+
+def is_snapshot(path: str) -> bool:
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def save_snapshot(world: WorldState, path: str) -> str:
+    """Writes `world` (node/crew statuses and attributes, not the repair clock) as a binary snapshot."""
+    nodes, crews = list(world.nodes.values()), list(world.crews.values())
+    vocabs: Dict[str, Dict[str, int]] = {name: {} for name in _NODE_COLUMNS + _CREW_COLUMNS}
+    columns = [
+        _encode([n.status for n in nodes], vocabs["status"]),
+        _encode([n.type for n in nodes], vocabs["type"]),
+        _encode([n.criticality for n in nodes], vocabs["criticality"]),
+        _encode([c.status for c in crews], vocabs["crew_status"]),
+        _encode([c.specialty for c in crews], vocabs["specialty"]),
+    ]
+    population = array("I", (n.population_affected for n in nodes))
+    if sys.byteorder != "little":
+        population.byteswap()
+    meta = json.dumps({name: list(vocab) for name, vocab in vocabs.items()}).encode("utf-8")
+    ids = "\n".join([n.node_id for n in nodes] + [c.crew_id for c in crews]).encode("utf-8")
+
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, len(nodes), len(crews), len(meta), len(ids)))
+        f.write(meta)
+        f.write(ids)
+        f.write(b"\x00" * (_align(f.tell()) - f.tell()))
+        f.write(population.tobytes())
+        for column in columns:
+            f.write(column)
+    return path
+
+
+class Snapshot:
+    """
+    A memory-mapped snapshot. The columns are zero-copy views of the file, so counting or filtering
+    nodes by code does not need a WorldState; to_world() builds one in bulk.
+    Use as a context manager (or call close()) to release the mapping.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.n_nodes, self.n_crews, meta_len, ids_len = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a version {VERSION} world state snapshot")
+        offset = _HEADER.size
+        self.vocabs: Dict[str, List[str]] = json.loads(self._mm[offset:offset + meta_len])
+        offset += meta_len
+        self._ids = (offset, ids_len)
+        offset = _align(offset + ids_len)
+
+        view = self._view = memoryview(self._mm)
+        self.population = view[offset:offset + 4 * self.n_nodes].cast("I")
+        offset += 4 * self.n_nodes
+        self.columns: Dict[str, memoryview] = {}
+        for name in _NODE_COLUMNS:
+            self.columns[name] = view[offset:offset + self.n_nodes]
+            offset += self.n_nodes
+        for name in _CREW_COLUMNS:
+            self.columns[name] = view[offset:offset + self.n_crews]
+            offset += self.n_crews
+
+    def ids(self) -> List[str]:
+        start, length = self._ids
+        return self._mm[start:start + length].decode("utf-8").split("\n") if length else []
+
+    def decoded(self, name: str) -> List[str]:
+        vocab = self.vocabs[name]
+        return [vocab[code] for code in self.columns[name]]
+
+    def count(self, name: str, value: str) -> int:
+        """How many records have `value` in column `name` (e.g. count('status', 'Broken')), without decoding."""
+        if value not in self.vocabs[name]:
+            return 0
+        return self.columns[name].tobytes().count(self.vocabs[name].index(value))
+
+    def to_world(self, seed: Optional[int] = None) -> WorldState:
+        ids = self.ids()
+        population = self.population.tolist()
+        if sys.byteorder != "little":
+            swapped = array("I", population)
+            swapped.byteswap()
+            population = swapped.tolist()
+        return WorldState.from_columns(
+            ids[:self.n_nodes], self.decoded("status"), self.decoded("type"), population,
+            self.decoded("criticality"), ids[self.n_nodes:], self.decoded("crew_status"),
+            self.decoded("specialty"), seed=seed)
+
+    def close(self):
+        # Τα memoryviews πρέπει να απελευθερωθούν πριν κλείσει το mmap
+        for column in getattr(self, "columns", {}).values():
+            column.release()
+        for name in ("population", "_view"):
+            if hasattr(self, name):
+                getattr(self, name).release()
+        self._mm.close()
+        self._file.close()
+
+    def __enter__(self) -> "Snapshot":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def load_snapshot(path: str, seed: Optional[int] = None) -> WorldState:
+    with Snapshot(path) as snap:
+        return snap.to_world(seed)
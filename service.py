@@ -0,0 +1,367 @@
+import argparse
+import json
+import queue
+import socketserver
+import statistics
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+
+import config
+import core
+from runlog import DECISION, WARNING
+from scenarios import jsonPicker
+from tools import solver, toolList
+from tools.worldState import WorldState
+
+STOP = None  # βάλτε το στην ουρά για να σταματήσει το service
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+class ServiceMetrics:
+    """Throughput and latency counters of a running AgentService (thread safe, bounded memory)."""
+
+    def __init__(self, window: int = 10000):
+        self.started = time.perf_counter()
+        self.events = 0
+        self.invalid_events = 0
+        self.batches = 0
+        self.replans = 0
+        self.assignments = 0
+        self.reports_computed = 0
+        self.reports_reused = 0
+        self._window = window
+        self._event_latency_ms: List[float] = []   # από την παραλαβή του event μέχρι το τέλος του re-plan
+        self._replan_ms: List[float] = []
+        self._lock = threading.Lock()
+
+    def _keep(self, values: List[float], value: float):
+        values.append(value)
+        if len(values) > self._window:
+            del values[:len(values) - self._window]
+
+    def record_batch(self, received: List[float], done: float, replan_ms: Optional[float]):
+        with self._lock:
+            self.batches += 1
+            self.events += len(received)
+            for t in received:
+                self._keep(self._event_latency_ms, (done - t) * 1000)
+            if replan_ms is not None:
+                self.replans += 1
+                self._keep(self._replan_ms, replan_ms)
+
+    def record_invalid(self):
+        with self._lock:
+            self.invalid_events += 1
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            elapsed = time.perf_counter() - self.started
+            latency = sorted(self._event_latency_ms)
+            replan = sorted(self._replan_ms)
+            return {
+                "uptime_s": round(elapsed, 3),
+                "events": self.events,
+                "invalid_events": self.invalid_events,
+                "events_per_s": round(self.events / elapsed, 1) if elapsed else 0.0,
+                "batches": self.batches,
+                "replans": self.replans,
+                "assignments": self.assignments,
+                "reports_computed": self.reports_computed,
+                "reports_reused": self.reports_reused,
+                "event_latency_ms": {"p50": round(_percentile(latency, 0.5), 3),
+                                     "p95": round(_percentile(latency, 0.95), 3),
+                                     "max": round(latency[-1], 3) if latency else 0.0},
+                "replan_ms": {"mean": round(statistics.fmean(replan), 3) if replan else 0.0,
+                              "p95": round(_percentile(replan, 0.95), 3)},
+            }
+
+
+class AgentService:
+    """
+    Long-running mode around one InfrastructureAgent: node / crew status-change events arrive on a
+    queue (or through serve_socket), are applied to the world state incrementally, and the agent
+    re-plans only for what changed, i.e. newly broken nodes, plus the ones still waiting, once a crew is free.
+
+    Events (one JSON object each):
+        {"node_id": "N1", "status": "Broken"}                       status change (new nodes also need
+                                                                    "type", "population_affected", "criticality")
+        {"crew_id": "C1", "status": "Available"}                    crew change (new crews also need "specialty");
+                                                                    a crew taken off a repair leaves its node Broken
+        {"clock": 240}                                              simulated minutes: repairs due by then finish
+
+    Events that are queued together are applied as one batch and followed by a single re-plan.
+    Impact reports are kept across events and only recomputed when a node's attributes change.
+    """
+
+    def __init__(self, agent: core.InfrastructureAgent, events: Optional[queue.Queue] = None,
+                 batch_size: int = 1000, max_steps_per_plan: int = 6):
+        self.agent = agent
+        self.world = agent.world_state
+        self.events = events if events is not None else queue.Queue()
+        self.batch_size = batch_size
+        self.max_steps_per_plan = max_steps_per_plan
+        self.metrics = ServiceMetrics()
+        # Cache των impact reports ανάμεσα στα events· το agent βλέπει κάθε φορά μόνο όσα είναι ακόμα Broken
+        self._reports: Dict[str, Dict] = dict(agent.memory["context"].get("impact_reports", {}))
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, event: Dict):
+        """Queues one event (thread safe); the receive time is kept for the latency metrics."""
+        self.events.put((time.perf_counter(), event))
+
+    def stop(self):
+        self.events.put(STOP)
+
+    def reject(self, line: str, error: Exception):
+        """Counts and logs an input line that is not a JSON event (the sources keep reading after it)."""
+        self.metrics.record_invalid()
+        self.agent.log(f"[SERVICE] invalid event line {line[:80]!r}: {error}", WARNING, "invalid_event",
+                       line=line[:200], error=str(error))
+
+    # --- εφαρμογή των events -------------------------------------------------------------------------
+
+    def apply(self, event: Dict) -> bool:
+        """Applies one event to the world state. Returns True if it may need a new plan."""
+        world = self.world
+        if "clock" in event:
+            return bool(world.advance_until(float(event["clock"])))
+        if "node_id" in event:
+            node_id, status = event["node_id"], event["status"]
+            node = world.nodes.get(node_id)
+            attrs = ("type", "population_affected", "criticality")
+            if node is None or any(k in event and event[k] != getattr(node, k) for k in attrs):
+                if node is None and not all(k in event for k in attrs):
+                    raise ValueError(f"New node '{node_id}' needs {attrs}")
+                world.add_node(node_id, status, *(event.get(k, getattr(node, k, None)) for k in attrs))
+                self._reports.pop(node_id, None)  # άλλαξαν τα στοιχεία του -> νέο impact report
+            crew_freed = False
+            if node is not None and node.status == "Repairing" and status != "Repairing":
+                # Η επισκευή τελείωσε (ή ακυρώθηκε) έξω από την προσομοίωση: το crew ελευθερώνεται
+                crew_id = world.cancel_repair(node_id)
+                if crew_id is not None and crew_id in world.crews:
+                    world.set_crew_status(crew_id, "Available")
+                    crew_freed = True
+            world.set_node_status(node_id, status)
+            return status == "Broken" or crew_freed
+        if "crew_id" in event:
+            crew_id, status = event["crew_id"], event["status"]
+            crew = world.crews.get(crew_id)
+            node_id = world.repair_of(crew_id) if status != "Busy" else None
+            if node_id is not None:
+                # Το crew δεν δουλεύει πια στον κόμβο: η επισκευή ακυρώνεται και ο κόμβος ξαναπεριμένει crew
+                world.cancel_repair(node_id)
+                world.set_node_status(node_id, "Broken")
+            if crew is None or ("specialty" in event and event["specialty"] != crew.specialty):
+                world.add_crew(crew_id, status, event.get("specialty", getattr(crew, "specialty", "General")))
+            else:
+                world.set_crew_status(crew_id, status)
+            return status == "Available" or node_id is not None
+        raise ValueError(f"Unknown event {event}")
+
+    # --- re-plan μόνο για το delta ---------------------------------------------------------------------
+
+    def replan(self) -> int:
+        """
+        Plans crews for the broken nodes that are still waiting. Only nodes without a cached impact
+        report are analyzed; DETECT is skipped because the event stream already says what broke.
+        Returns the number of crews assigned.
+        """
+        agent, world = self.agent, self.world
+        broken = world.node_ids_with_status("Broken")
+        if not broken or not any(world.available_crews_for(world.nodes[n].type) for n in broken):
+            return 0
+        agent.memory["context"]["failures"] = broken
+        missing = [n for n in broken if n not in self._reports]
+        self.metrics.reports_reused += len(broken) - len(missing)
+        if missing and agent.planner != "llm":
+            # Με solver δεν χρειάζεται το LLM για την ανάλυση: τα reports υπολογίζονται απευθείας
+            self._reports.update(toolList.estimate_impacts(world, missing))
+            self.metrics.reports_computed += len(missing)
+            missing = []
+        # Στο context (και άρα στο prompt) μόνο οι κόμβοι που περιμένουν ακόμα, όχι όσοι επισκευάστηκαν
+        agent.memory["context"]["impact_reports"] = {n: self._reports[n] for n in broken if n in self._reports}
+        agent.state = core.AgentState.ANALYZE if missing else core.AgentState.PLAN
+
+        busy_before = world.count_crews("Busy")
+        for _ in range(self.max_steps_per_plan):
+            agent.step()
+            if agent.state in (core.AgentState.FINAL, core.AgentState.WAIT):
+                break
+        if agent.planner == "llm":
+            self.metrics.reports_computed += len(missing)
+            self._reports.update(agent.memory["context"]["impact_reports"])  # ό,τι ανέλυσε το LLM
+        # Τα spans του tracer και τα prompt stats θα μεγάλωναν για πάντα σε ένα service που δεν τελειώνει
+        agent.tracer.events.clear()
+        agent.prompt_stats.clear()
+        assigned = max(world.count_crews("Busy") - busy_before, 0)
+        self.metrics.assignments += assigned
+        return assigned
+
+    # --- κύριος βρόχος --------------------------------------------------------------------------------
+
+    def _next_batch(self, timeout: Optional[float]) -> Optional[List]:
+        try:
+            first = self.events.get(timeout=timeout)
+        except queue.Empty:
+            return []
+        if first is STOP:
+            return None
+        batch = [first]
+        # Ό,τι έχει ήδη μαζευτεί στην ουρά εφαρμόζεται μαζί και ακολουθεί ένα μόνο re-plan
+        while len(batch) < self.batch_size:
+            try:
+                item = self.events.get_nowait()
+            except queue.Empty:
+                break
+            if item is STOP:
+                self.events.put(STOP)
+                break
+            batch.append(item)
+        return batch
+
+    def run(self, idle_timeout: Optional[float] = None, metrics_every: Optional[float] = None):
+        """
+        Consumes events until STOP is queued (or, with idle_timeout, until no event arrives for that long).
+        metrics_every: log the metrics every that many seconds.
+        """
+        last_report = time.perf_counter()
+        while True:
+            batch = self._next_batch(idle_timeout if idle_timeout is not None else 1.0)
+            if batch is None or (batch == [] and idle_timeout is not None):
+                break
+            received, changed = [], False
+            for item in batch:
+                t, event = item if isinstance(item, tuple) else (time.perf_counter(), item)
+                received.append(t)
+                try:
+                    changed |= self.apply(event)
+                except (KeyError, ValueError, TypeError) as e:
+                    self.metrics.record_invalid()
+                    self.agent.log(f"[SERVICE] invalid event {event}: {e}", WARNING, "invalid_event",
+                                   event=event, error=str(e))
+            replan_ms = None
+            if changed:
+                t0 = time.perf_counter()
+                self.replan()
+                replan_ms = (time.perf_counter() - t0) * 1000
+            if received:
+                self.metrics.record_batch(received, time.perf_counter(), replan_ms)
+            if metrics_every and time.perf_counter() - last_report >= metrics_every:
+                metrics = self.metrics.snapshot()
+                self.agent.log(f"[METRICS]: {metrics}", DECISION, "metrics", metrics=metrics)
+                last_report = time.perf_counter()
+        return self.metrics.snapshot()
+
+    def start(self, **kwargs) -> threading.Thread:
+        """Runs run() in a background thread."""
+        self._thread = threading.Thread(target=self.run, kwargs=kwargs, name="agent-service", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def join(self, timeout: Optional[float] = None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+
+class _EventHandler(socketserver.StreamRequestHandler):
+    # Μία γραμμή JSON ανά event. Η γραμμή "stats" επιστρέφει τα metrics, η "stop" σταματά το service.
+    def handle(self):
+        service: AgentService = self.server.service
+        for raw in self.rfile:
+            line = raw.decode("utf-8").strip()
+            if not line:
+                continue
+            if line == "stats":
+                self.wfile.write((json.dumps(service.metrics.snapshot()) + "\n").encode("utf-8"))
+            elif line == "stop":
+                service.stop()
+                break
+            else:
+                try:
+                    service.submit(json.loads(line))
+                except ValueError as e:
+                    service.reject(line, e)
+                    self.wfile.write((json.dumps({"error": str(e)}) + "\n").encode("utf-8"))
+
+
+def serve_socket(service: AgentService, host: str = "127.0.0.1", port: int = 8765) -> socketserver.ThreadingTCPServer:
+    """
+    Accepts JSON-lines events on a local TCP socket (one reader thread per connection) and feeds them
+    to the service queue. Call server.shutdown() to stop accepting connections.
+    """
+    server = socketserver.ThreadingTCPServer((host, port), _EventHandler)
+    server.daemon_threads = True
+    server.service = service
+    threading.Thread(target=server.serve_forever, name="service-socket", daemon=True).start()
+    return server
+
+
+def _build_agent(scenario: Optional[str], planner: str, backend_kind: Optional[str], console_level: str,
+                 seed: int) -> core.InfrastructureAgent:
+    from llm.backends import make_backend
+
+    world = jsonPicker.load_world(scenario, seed=seed) if scenario else WorldState(seed)
+    backend = make_backend(backend_kind) if backend_kind else None
+    # Χωρίς προσομοίωση του ρολογιού: ο χρόνος έρχεται από τα events ({"clock": ...})
+    return core.InfrastructureAgent(world, max_steps=sys.maxsize, backend=backend, planner=planner,
+                                    simulate_repairs=False, console_level=console_level, trace_formats=())
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Long-running agent that re-plans on node/crew status events.")
+    parser.add_argument("--scenario", default=None, help="initial world state (.json or .wsnap; default: empty)")
+    parser.add_argument("--planner", choices=list(solver.PLANNERS), default="greedy")
+    parser.add_argument("--backend", choices=["cloud", "ollama", "local"], default=None)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--stdin", action="store_true", help="read JSON-lines events from stdin instead of a socket")
+    parser.add_argument("--console-level", choices=["debug", "info", "decision", "warning", "off"], default="decision")
+    parser.add_argument("--metrics-every", type=float, default=10.0, help="seconds between metrics log lines")
+    parser.add_argument("--seed", type=int, default=config.seed_int)
+    args = parser.parse_args(argv)
+
+    agent = _build_agent(args.scenario, args.planner, args.backend, args.console_level, args.seed)
+    service = AgentService(agent)
+    log_filename = agent._open_log("service")
+    try:
+        if args.stdin:
+            def read_stdin():
+                try:
+                    for line in sys.stdin:
+                        if not line.strip():
+                            continue
+                        try:
+                            event = json.loads(line)
+                        except ValueError as e:
+                            service.reject(line.strip(), e)
+                            continue
+                        service.submit(event)
+                finally:
+                    service.stop()
+            threading.Thread(target=read_stdin, name="service-stdin", daemon=True).start()
+            metrics = service.run(metrics_every=args.metrics_every)
+        else:
+            server = serve_socket(service, args.host, args.port)
+            print(f"[SERVICE] listening on {args.host}:{args.port} (JSON lines, 'stats', 'stop')")
+            try:
+                metrics = service.run(metrics_every=args.metrics_every)
+            except KeyboardInterrupt:
+                metrics = service.metrics.snapshot()
+            finally:
+                server.shutdown()
+                server.server_close()
+    finally:
+        agent._close_log(log_filename)
+    print(f"[SERVICE] {json.dumps(metrics, indent=2)}")
+    return metrics
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+import glob
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List
+
+
+class Tracer:
+    """
+    Collects structured per-step spans of one agent run (context build, LLM call, solver, tool,
+    state transition) and exports them as JSONL or as Chrome trace events (chrome://tracing, Perfetto).
+    """
+
+    def __init__(self, name: str = "agent"):
+        self.name = name
+        self.events: List[Dict] = []
+        self._t0 = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def _now_us(self) -> float:
+        return (time.perf_counter() - self._t0) * 1e6
+
+    @contextmanager
+    def span(self, name: str, **args) -> Iterator[Dict]:
+        """
+        Times the block as one span. The yielded dict becomes the span's args, so the block can
+        attach measurements (tokens, cache hits, ...) before it ends.
+        """
+        start = self._now_us()
+        try:
+            yield args
+        finally:
+            event = {"name": name, "ts_us": round(start, 1), "dur_us": round(self._now_us() - start, 1), "args": args}
+            with self._lock:
+                self.events.append(event)
+
+    def instant(self, name: str, **args):
+        with self._lock:
+            self.events.append({"name": name, "ts_us": round(self._now_us(), 1), "dur_us": None, "args": args})
+
+    def export_jsonl(self, path: str) -> str:
+        with open(path, "w", encoding="utf-8") as f:
+            for event in self.events:
+                f.write(json.dumps({"run": self.name, **event}, ensure_ascii=False) + "\n")
+        return path
+
+    def export_chrome(self, path: str) -> str:
+        pid = os.getpid()
+        trace = []
+        for e in self.events:
+            event = {"name": e["name"], "cat": "agent", "ts": e["ts_us"], "pid": pid, "tid": self.name, "args": e["args"]}
+            if e["dur_us"] is None:
+                event.update({"ph": "i", "s": "t"})
+            else:
+                event.update({"ph": "X", "dur": e["dur_us"]})
+            trace.append(event)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": trace, "displayTimeUnit": "ms"}, f, ensure_ascii=False)
+        return path
+
+    def export(self, base_path: str, formats=("jsonl",)) -> List[str]:
+        """Writes <base_path>.trace.jsonl and/or <base_path>.trace.json (Chrome) next to the run log."""
+        paths = []
+        if "jsonl" in formats:
+            paths.append(self.export_jsonl(base_path + ".trace.jsonl"))
+        if "chrome" in formats:
+            paths.append(self.export_chrome(base_path + ".trace.json"))
+        return paths
+
+
+def summarize(paths: List[str]) -> Dict[str, Dict]:
+    """
+    Aggregates JSONL traces of many runs: count, total/mean/max duration per span name and
+    total tokens in/out of the LLM spans.
+    """
+    summary: Dict[str, Dict] = {}
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                e = json.loads(line)
+                if e.get("dur_us") is None:
+                    continue
+                s = summary.setdefault(e["name"], {"count": 0, "total_ms": 0.0, "max_ms": 0.0,
+                                                   "tokens_in": 0, "tokens_out": 0})
+                dur_ms = e["dur_us"] / 1000
+                s["count"] += 1
+                s["total_ms"] += dur_ms
+                s["max_ms"] = max(s["max_ms"], dur_ms)
+                s["tokens_in"] += e["args"].get("tokens_in") or 0
+                s["tokens_out"] += e["args"].get("tokens_out") or 0
+    for s in summary.values():
+        s["mean_ms"] = s["total_ms"] / s["count"]
+    return summary
+
+
+def print_summary(summary: Dict[str, Dict]):
+    print(f"{'span':<16}{'count':>8}{'total ms':>12}{'mean ms':>10}{'max ms':>10}{'tok in':>10}{'tok out':>10}")
+    for name, s in sorted(summary.items(), key=lambda kv: -kv[1]["total_ms"]):
+        print(f"{name:<16}{s['count']:>8}{s['total_ms']:>12.2f}{s['mean_ms']:>10.2f}{s['max_ms']:>10.2f}"
+              f"{s['tokens_in']:>10}{s['tokens_out']:>10}")
+
+
+if __name__ == "__main__":
+    # π.χ. python telemetry.py "runs/*.trace.jsonl"
+    files = [p for pattern in (sys.argv[1:] or ["*.trace.jsonl"]) for p in glob.glob(pattern)]
+    if not files:
+        print("No trace files found.")
+    else:
+        print_summary(summarize(files))
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Τα tests τρέχουν με imports από το root του project (όπως τα scripts)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
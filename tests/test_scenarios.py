@@ -0,0 +1,72 @@
+import json
+
+import pytest
+
+from scenarios import jsonPicker, snapshot
+from scenarios.generator import generate_scenario
+from tools.worldState import WorldState
+
+SCENARIO = generate_scenario(200, seed=7)
+# Κλειδιά με escapes / unicode και άλλα top-level πεδία που ο streaming loader πρέπει να προσπεράσει
+SCENARIO["nodes"]['Node "quoted" \\ Ωμέγα'] = {"status": "Broken", "type": "Water", "population_affected": 0,
+                                               "criticality": "Low"}
+SCENARIO["meta"] = {"nodes": {"fake": 1}, "note": "}, {"}
+
+
+@pytest.fixture
+def scenario_file(tmp_path):
+    path = tmp_path / "scenario.json"
+    path.write_text(json.dumps(SCENARIO, indent=4, ensure_ascii=False), encoding="utf-8")
+    return str(path)
+
+
+def _expected():
+    return WorldState.from_dict(SCENARIO).to_dict()
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 4096, jsonPicker.CHUNK_SIZE])
+def test_stream_matches_json_load_at_any_chunk_size(scenario_file, chunk_size):
+    assert jsonPicker.stream_world_state(scenario_file, chunk_size=chunk_size).to_dict() == _expected()
+
+
+def test_stream_of_empty_sections(tmp_path):
+    path = tmp_path / "empty.json"
+    path.write_text('{"nodes": {}, "crews": {} }', encoding="utf-8")
+    world = jsonPicker.stream_world_state(str(path))
+    assert world.nodes == {} and world.crews == {}
+
+
+def test_truncated_file_raises(tmp_path):
+    path = tmp_path / "broken.json"
+    path.write_text(json.dumps(SCENARIO)[:-40], encoding="utf-8")
+    with pytest.raises(ValueError):
+        jsonPicker.stream_world_state(str(path), chunk_size=64)
+
+
+def test_save_world_state_round_trip(tmp_path):
+    world = WorldState.from_dict(SCENARIO)
+    result = jsonPicker.save_world_state(world, str(tmp_path / "out.json"))
+    assert jsonPicker.load_world(result).to_dict() == _expected()
+    assert jsonPicker.stream_world_state(result).to_dict() == _expected()
+
+
+def test_snapshot_round_trip(tmp_path):
+    path = snapshot.save_snapshot(WorldState.from_dict(SCENARIO), str(tmp_path / ("world" + snapshot.SNAPSHOT_EXT)))
+    assert snapshot.is_snapshot(path)
+    assert jsonPicker.load_world(path).to_dict() == _expected()
+    with snapshot.Snapshot(path) as snap:
+        assert snap.count("status", "Broken") == sum(n["status"] == "Broken" for n in SCENARIO["nodes"].values())
+        assert snap.count("status", "no such status") == 0
+        assert snap.ids()[:snap.n_nodes] == list(SCENARIO["nodes"])
+
+
+def test_empty_snapshot_round_trip(tmp_path):
+    path = snapshot.save_snapshot(WorldState(), str(tmp_path / ("empty" + snapshot.SNAPSHOT_EXT)))
+    world = snapshot.load_snapshot(path)
+    assert world.nodes == {} and world.crews == {}
+
+
+def test_json_file_is_not_a_snapshot(scenario_file):
+    assert not snapshot.is_snapshot(scenario_file)
+    with pytest.raises(ValueError):
+        snapshot.Snapshot(scenario_file)
@@ -0,0 +1,88 @@
+import random
+
+import pytest
+
+from scenarios.generator import CRITICALITIES, NODE_TYPES, SPECIALTIES
+from tools import solver, toolList
+from tools.worldState import WorldState, crew_can_fix
+
+
+def _random_world(rng: random.Random, n_nodes: int, n_crews: int) -> WorldState:
+    return WorldState.from_dict({
+        "nodes": {f"N{i}": {"status": rng.choice(["Broken", "Broken", "Operational"]), "type": rng.choice(NODE_TYPES),
+                            "population_affected": rng.randint(0, 50), "criticality": rng.choice(CRITICALITIES)}
+                  for i in range(n_nodes)},
+        "crews": {f"C{i}": {"status": rng.choice(["Available", "Available", "Busy"]),
+                            "specialty": rng.choice(SPECIALTIES)}
+                  for i in range(n_crews)},
+    })
+
+
+def _reports(world: WorldState):
+    return list(toolList.estimate_impacts(world, list(world.nodes)).values())
+
+
+def _score(world: WorldState, pairs):
+    # Πρώτα πόσοι κόμβοι ανά criticality (από την υψηλότερη), μετά ο πληθυσμός: οι κανόνες του PLAN
+    nodes = [world.nodes[n] for n, _ in pairs]
+    by_class = tuple(sum(n.criticality == c for n in nodes) for c in CRITICALITIES)
+    return by_class + (sum(n.population_affected for n in nodes),)
+
+
+def _brute_force(world: WorldState):
+    nodes = world.node_ids_with_status("Broken")
+    crews = world.available_crews()
+    best = []
+
+    def search(i, used, pairs):
+        nonlocal best
+        if i == len(nodes):
+            if _score(world, pairs) > _score(world, best):
+                best = list(pairs)
+            return
+        search(i + 1, used, pairs)
+        for c in crews:
+            if c not in used and crew_can_fix(world.crews[c].specialty, world.nodes[nodes[i]].type):
+                search(i + 1, used | {c}, pairs + [(nodes[i], c)])
+
+    search(0, frozenset(), [])
+    return best
+
+
+def _assert_valid(world: WorldState, pairs):
+    crews = [c for _, c in pairs]
+    assert len(set(crews)) == len(crews)
+    assert len({n for n, _ in pairs}) == len(pairs)
+    for n, c in pairs:
+        assert world.nodes[n].status == "Broken"
+        assert world.crews[c].status == "Available"
+        assert crew_can_fix(world.crews[c].specialty, world.nodes[n].type)
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_optimal_matches_brute_force(seed):
+    rng = random.Random(seed)
+    world = _random_world(rng, rng.randint(0, 6), rng.randint(0, 5))
+    pairs = solver.optimal_assignment(_reports(world), world)
+    _assert_valid(world, pairs)
+    assert _score(world, pairs) == _score(world, _brute_force(world))
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_greedy_is_valid_and_never_beats_optimal(seed):
+    rng = random.Random(seed)
+    world = _random_world(rng, rng.randint(0, 8), rng.randint(0, 6))
+    reports = _reports(world)
+    greedy = solver.greedy_assignment(reports, world)
+    _assert_valid(world, greedy)
+    assert _score(world, greedy) <= _score(world, solver.optimal_assignment(reports, world))
+
+
+def test_optimal_uses_the_specialist_so_the_general_crew_can_take_the_other_node():
+    world = WorldState.from_dict({
+        "nodes": {"P": {"status": "Broken", "type": "Power", "population_affected": 100, "criticality": "Critical"},
+                  "W": {"status": "Broken", "type": "Telecom", "population_affected": 10, "criticality": "Low"}},
+        "crews": {"G": {"status": "Available", "specialty": "General"},
+                  "E": {"status": "Available", "specialty": "Electrical"}},
+    })
+    assert sorted(solver.optimal_assignment(_reports(world), world)) == [("P", "E"), ("W", "G")]
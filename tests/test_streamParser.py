@@ -0,0 +1,62 @@
+import json
+
+import pytest
+
+from llm.streamParser import IncrementalJSONParser
+
+DOCUMENTS = [
+    {"action": "assign_repair_crew", "arguments": {"node_ids": ["A", "B"], "crew_ids": ["C1", "C2"]},
+     "next_state": "FINAL", "thought": "Critical first, then population."},
+    {"action": "none", "arguments": {}, "next_state": "PLAN", "thought": 'quotes \\" and braces {[}] in "text"'},
+    {"a": 1, "b": -2.5e3, "c": True, "d": None, "e": [1, [2, {"f": "}"}]], "g": "ünïcode ✓"},
+    {"last_is_number": 42},
+    {},
+]
+
+
+def _feed(text: str, chunks):
+    parser = IncrementalJSONParser()
+    for chunk in chunks:
+        parser.feed(chunk)
+    return parser
+
+
+@pytest.mark.parametrize("doc", DOCUMENTS)
+@pytest.mark.parametrize("indent", [None, 2])
+def test_every_split_point_gives_the_same_fields(doc, indent):
+    text = json.dumps(doc, indent=indent, ensure_ascii=False)
+    for cut in range(len(text) + 1):
+        parser = _feed(text, [text[:cut], text[cut:]])
+        assert parser.done
+        assert parser.fields == doc, cut
+        assert parser.text == text
+
+
+@pytest.mark.parametrize("doc", DOCUMENTS)
+def test_character_by_character(doc):
+    text = json.dumps(doc)
+    parser = _feed(text, text)
+    assert parser.done and parser.fields == doc
+
+
+def test_action_is_ready_before_the_thought_ends():
+    text = json.dumps(DOCUMENTS[0])
+    parser = IncrementalJSONParser()
+    parser.feed(text[:text.index('"thought"') + 15])
+    assert parser.has("action", "arguments", "next_state")
+    assert not parser.has("thought")
+    assert not parser.done
+
+
+def test_primitive_value_is_only_complete_at_its_delimiter():
+    parser = _feed('{"n": 12', ['{"n": 12'])
+    assert not parser.has("n")  # μπορεί να ακολουθούν κι άλλα ψηφία
+    parser.feed("3}")
+    assert parser.fields == {"n": 123}
+
+
+def test_markdown_fence_and_trailing_text_are_ignored():
+    text = '```json\n{"action": "none", "arguments": {}}\n```'
+    parser = _feed(text, [text[:5], text[5:20], text[20:]])
+    assert parser.done
+    assert parser.fields == {"action": "none", "arguments": {}}
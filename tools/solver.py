@@ -0,0 +1,142 @@
+from typing import Dict, List, Tuple
+
+from tools.worldState import WorldState, crew_can_fix
+
+CRITICALITY_RANK = {"Critical": 3, "High": 2, "Medium": 1, "Low": 0}
+PLANNERS = ("llm", "greedy", "optimal")
+
+
+def priority_key(report: Dict) -> Tuple[int, int]:
+    """Sort key of an impact report: criticality first, then population (both descending when reversed)."""
+    return CRITICALITY_RANK.get(report.get("criticality"), -1), report.get("population_affected", 0)
+
+
+def _repairable(reports: List[Dict], world: WorldState) -> List[Dict]:
+    # Μόνο όσοι κόμβοι είναι ακόμα Broken (ένα report μπορεί να είναι από προηγούμενο βήμα)
+    seen = set()
+    result = []
+    for r in reports:
+        node_id = r.get("node_id")
+        node = world.nodes.get(node_id)
+        if node is not None and node.status == "Broken" and node_id not in seen:
+            seen.add(node_id)
+            result.append(r)
+    return result
+
+
+def greedy_assignment(reports: List[Dict], world: WorldState) -> List[Tuple[str, str]]:
+    """
+    Walks the broken nodes from highest to lowest priority and gives each one an available crew
+    that can fix it. Specialists are preferred so that 'General' crews stay free for node types
+    nobody else can fix.
+
+    Args:
+        reports (List[Dict]): Impact reports as returned by estimate_impact.
+        world (WorldState): Current world state (read only).
+
+    Returns:
+        List[Tuple[str, str]]: (node_id, crew_id) pairs, highest priority first.
+    """
+    used = set()
+    pairs = []
+    n_available = world.count_crews("Available")
+    for r in sorted(_repairable(reports, world), key=priority_key, reverse=True):
+        if len(used) == n_available:
+            break  # όλα τα crews έχουν ανατεθεί, οι υπόλοιποι κόμβοι περιμένουν
+        for crew_id in world.available_crews_for(world.nodes[r["node_id"]].type):
+            if crew_id not in used:
+                used.add(crew_id)
+                pairs.append((r["node_id"], crew_id))
+                break
+    return pairs
+
+
+def _hungarian(cost: List[List[int]]) -> List[int]:
+    """
+    Minimum-cost assignment for an n x m matrix with n <= m (Hungarian algorithm, O(n^2 m)).
+    Returns, for every row, the column it is assigned to.
+    """
+    n, m = len(cost), len(cost[0])
+    inf = float("inf")
+    u, v = [0] * (n + 1), [0] * (m + 1)
+    p, way = [0] * (m + 1), [0] * (m + 1)
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = [inf] * (m + 1)
+        used = [False] * (m + 1)
+        while True:
+            used[j0] = True
+            i0, delta, j1 = p[j0], inf, 0
+            row = cost[i0 - 1]
+            for j in range(1, m + 1):
+                if not used[j]:
+                    cur = row[j - 1] - u[i0] - v[j]
+                    if cur < minv[j]:
+                        minv[j], way[j] = cur, j0
+                    if minv[j] < delta:
+                        delta, j1 = minv[j], j
+            for j in range(m + 1):
+                if used[j]:
+                    u[p[j]] += delta
+                    v[j] -= delta
+                else:
+                    minv[j] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+        while j0:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+    assignment = [0] * n
+    for j in range(1, m + 1):
+        if p[j]:
+            assignment[p[j] - 1] = j - 1
+    return assignment
+
+
+def optimal_assignment(reports: List[Dict], world: WorldState) -> List[Tuple[str, str]]:
+    """
+    Optimal bipartite matching between broken nodes and available crews.
+
+    The weight of a node grows so fast with criticality that one node of a higher class always
+    outweighs any number of lower ones; population breaks ties inside a class. The matching with
+    the maximum total weight is therefore the best plan under the PLAN rules, and unlike the greedy
+    pass it never leaves a node unassigned because a crew was spent on a node others could fix.
+    """
+    nodes = sorted(_repairable(reports, world), key=priority_key, reverse=True)
+    crews = world.available_crews()
+    if not nodes or not crews:
+        return []
+
+    base = len(nodes) + 1
+    total_population = sum(max(r.get("population_affected", 0), 0) for r in nodes) + 1
+    weights = [(base ** (CRITICALITY_RANK.get(r.get("criticality"), -1) + 1)) * total_population
+               + max(r.get("population_affected", 0), 0) for r in nodes]
+    # cost = -weight όπου μπορεί το crew να φτιάξει τον κόμβο, 0 όπου δεν μπορεί (=καμία ανάθεση)
+    cost = [[-w if crew_can_fix(world.crews[c].specialty, world.nodes[r["node_id"]].type) else 0 for c in crews]
+            for r, w in zip(nodes, weights)]
+
+    pairs = []
+    if len(nodes) <= len(crews):
+        for i, j in enumerate(_hungarian(cost)):
+            if cost[i][j] < 0:
+                pairs.append((nodes[i]["node_id"], crews[j]))
+    else:
+        transposed = [list(col) for col in zip(*cost)]
+        for j, i in enumerate(_hungarian(transposed)):
+            if cost[i][j] < 0:
+                pairs.append((nodes[i]["node_id"], crews[j]))
+        rank = {r["node_id"]: k for k, r in enumerate(nodes)}
+        pairs.sort(key=lambda pair: rank[pair[0]])
+    return pairs
+
+
+def plan_assignment(reports: List[Dict], world: WorldState, mode: str = "greedy") -> List[Tuple[str, str]]:
+    """Dispatches to greedy_assignment / optimal_assignment by planner name."""
+    if mode == "greedy":
+        return greedy_assignment(reports, world)
+    if mode == "optimal":
+        return optimal_assignment(reports, world)
+    raise ValueError(f"Unknown planner '{mode}' (expected 'greedy' or 'optimal')")
@@ -1,66 +1,114 @@
 from typing import Dict, Union, List
-import random
-from config import WORLD_STATE
+from tools.worldState import WorldState, crew_can_fix
 
-def detect_failure_nodes() -> List[str]:
+def detect_failure_nodes(world_state: WorldState) -> List[str]:
     """
     Scans the infrastructure network to identify nodes that have failed.
     
+    Args:
+        world_state (WorldState): The agent's world state.
+        
     Returns:
         List[str]: A list of node IDs that currently have a "Broken" status. 
         Example: ['Node_Water_Pump_A', 'Node_Power_Substation_C']
     """
-    return [n for n, d in WORLD_STATE["nodes"].items() if d["status"] == "Broken"]
+    return world_state.node_ids_with_status("Broken")
 
-def estimate_impact(node_id: str) -> Dict[str, Union[str, int]]:
+def estimate_impact(world_state: WorldState, node_id: str) -> Dict[str, Union[str, int]]:
     """
     Calculates the social and functional impact of a specific failed node.
     
     Args:
+        world_state (WorldState): The agent's world state.
         node_id (str): The ID of the node to analyze.
         
     Returns:
         Dict: Metrics including population affected and criticality level.
         Example: {'population_affected': 5000, 'criticality': 'High'}
     """
-    if node := WORLD_STATE["nodes"].get(node_id):
-        return {"node_id": node_id, "type": node["type"], 
-                "population_affected": node["population_affected"], "criticality": node["criticality"]}
+    if node := world_state.nodes.get(node_id):
+        return {"node_id": node_id, "type": node.type, 
+                "population_affected": node.population_affected, "criticality": node.criticality}
     return {"error": "Node not found"}
 
-def assign_repair_crew(node_ids: List[str], crew_ids: List[str]) -> Dict[str, str]:
+def estimate_impacts(world_state: WorldState, node_ids: List[str]) -> Dict[str, Dict[str, Union[str, int]]]:
+    """
+    Calculates the impact of many failed nodes in one call (one agent step for a whole outage).
+    
+    Args:
+        world_state (WorldState): The agent's world state.
+        node_ids (List[str]): The IDs of the nodes to analyze.
+        
+    Returns:
+        Dict: Impact reports keyed by node ID (same fields as estimate_impact).
+        Example: {'Node_Water_Pump_A': {'node_id': 'Node_Water_Pump_A', 'population_affected': 5000, ...}}
+    """
+    return {n: estimate_impact(world_state, n) for n in node_ids}
+
+def assign_repair_crew(world_state: WorldState, node_ids: List[str], crew_ids: List[str]) -> Dict[str, str]:
     """
     Assigns available repair crews to broken nodes to initiate repairs.
     
     Args:
+        world_state (WorldState): The agent's world state (updated in place).
         node_ids (List[str]): A list of broken node IDs.
         crew_ids (List[str]): A list of crew IDs to be assigned.
         
     Returns:
-        Dict: A report of successful assignments and failures due to crew unavailability.
+        Dict: A report of successful assignments and failures (crew not available or unable to fix the
+        node's type, node not 'Broken').
     """
     results = {}
     for n, c in zip(node_ids, crew_ids):
-        if c not in WORLD_STATE["crews"]:
+        if c not in world_state.crews:
             results[f"{c}->{n}"] = f"Failed (Crew '{c}' not found)"
             continue
-        crew_status = WORLD_STATE["crews"][c]["status"]
+        if n not in world_state.nodes:
+            results[f"{c}->{n}"] = f"Failed (Node '{n}' not found)"
+            continue
+        node_status = world_state.nodes[n].status
+        if node_status != "Broken":
+            # π.χ. το ίδιο node δύο φορές στην κλήση ή ήδη σε επισκευή: δεύτερο crew θα έμενε Busy για πάντα
+            results[f"{c}->{n}"] = f"Failed (Node {node_status})"
+            continue
+        crew_status = world_state.crews[c].status
         if crew_status != "Available":
             results[f"{c}->{n}"] = f"Failed (Crew {crew_status})"
+        elif not crew_can_fix(world_state.crews[c].specialty, world_state.nodes[n].type):
+            results[f"{c}->{n}"] = f"Failed (Crew {c} cannot fix {world_state.nodes[n].type})"
         else:
-            WORLD_STATE["nodes"][n]["status"] = "Repairing"
-            WORLD_STATE["crews"][c]["status"] = "Busy"  # Το crew γίνεται Busy!
+            world_state.set_node_status(n, "Repairing")
+            world_state.set_crew_status(c, "Busy")  # Το crew γίνεται Busy!
             # Υπολογισμός διάρκειας επισκευής (π.χ. 60-240 λεπτά)
-            duration = random.randint(60, 240)
+            duration = world_state.rng.randint(60, 240)
+            world_state.schedule_repair(n, c, duration)  # η ολοκλήρωση μπαίνει στο ρολόι της προσομοίωσης
             results[f"{c}->{n}"] = f"Success (Duration: {duration} mins)"
-            print(f"Crew {c} is now BUSY repairing {n} (Duration: {duration} mins)")
     return results
 
-def check_crew_availability() -> Dict[str, str]:
+def wait_for_repairs(world_state: WorldState) -> Dict[str, Union[float, int, list]]:
+    """
+    Fast-forwards the simulation clock to the next repair completion (no real waiting).
+    
+    Args:
+        world_state (WorldState): The agent's world state (updated in place).
+        
+    Returns:
+        Dict: The new clock (minutes), the repairs that finished and how many are still in progress.
+        Example: {'clock_min': 95.0, 'completed': [{'node_id': 'Node_Water_Pump_A', 'crew_id': 'Crew_Alpha'}], 'pending': 2}
+    """
+    completed = world_state.advance()
+    return {"clock_min": world_state.clock,
+            "completed": [{"node_id": n, "crew_id": c} for n, c in completed],
+            "pending": world_state.pending_repairs()}
+
+def check_crew_availability(world_state: WorldState) -> Dict[str, str]:
     """
     Retrieves the current availability status of all repair crews.
     
+    Args:
+        world_state (WorldState): The agent's world state.
+        
     Returns:
         Dict: Crew IDs mapped to their current status ('Available' or 'Busy').
     """
-    return {c: d["status"] for c, d in WORLD_STATE["crews"].items()}
\ No newline at end of file
+    return {c: crew.status for c, crew in world_state.crews.items()}
\ No newline at end of file
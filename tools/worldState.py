@@ -0,0 +1,231 @@
+import heapq
+import itertools
+import random
+from typing import Dict, List, Optional, Tuple
+
+# Οι ειδικότητες που δεν έχουν το ίδιο όνομα με τον τύπο κόμβου που επισκευάζουν
+SPECIALTY_FIXES = {"Electrical": "Power"}
+
+
+def crew_can_fix(specialty: str, node_type: str) -> bool:
+    """'General' crews fix anything, specialized crews only their own node type."""
+    return specialty == "General" or SPECIALTY_FIXES.get(specialty, specialty) == node_type
+
+
+class Node:
+    __slots__ = ("node_id", "status", "type", "population_affected", "criticality")
+
+    def __init__(self, node_id: str, status: str, type: str, population_affected: int, criticality: str):
+        self.node_id = node_id
+        self.status = status
+        self.type = type
+        self.population_affected = population_affected
+        self.criticality = criticality
+
+    def to_dict(self) -> Dict:
+        return {"status": self.status, "type": self.type,
+                "population_affected": self.population_affected, "criticality": self.criticality}
+
+
+class Crew:
+    __slots__ = ("crew_id", "status", "specialty")
+
+    def __init__(self, crew_id: str, status: str, specialty: str):
+        self.crew_id = crew_id
+        self.status = status
+        self.specialty = specialty
+
+    def to_dict(self) -> Dict:
+        return {"status": self.status, "specialty": self.specialty}
+
+
+class WorldState:
+    """
+    Nodes and crews of one scenario, with indexes kept up to date on every status change:
+    nodes by status ('Broken', 'Repairing', ...), crews by status ('Available', 'Busy')
+    and crews by specialty. Lookups cost O(matches) instead of a scan of the whole network.
+
+    Status changes MUST go through set_node_status / set_crew_status, otherwise the indexes go stale.
+
+    It also holds a discrete-event clock (simulated minutes) with a priority queue of repair
+    completions: schedule_repair() queues one, advance() jumps straight to the next one and frees
+    the node and the crew, so hours of repairs are simulated without waiting. Random draws of the
+    simulation (repair durations) come from the world's own RNG, so a seeded world replays exactly.
+    """
+
+    def __init__(self, seed: Optional[int] = None):
+        self.nodes: Dict[str, Node] = {}
+        self.crews: Dict[str, Crew] = {}
+        # dict αντί για set: O(1) insert/delete αλλά με σταθερή σειρά (ίδια με το αρχείο του σεναρίου)
+        self._nodes_by_status: Dict[str, Dict[str, None]] = {}
+        self._crews_by_status: Dict[str, Dict[str, None]] = {}
+        self._crews_by_specialty: Dict[str, Dict[str, None]] = {}
+        self.clock = 0.0  # simulated minutes since the start of the scenario
+        # heap με (ώρα ολοκλήρωσης, αύξων αριθμός, node_id, crew_id) - ο αριθμός κρατάει σταθερή σειρά στις ισοπαλίες
+        self._repairs: List[Tuple[float, int, str, str]] = []
+        self._repair_seq = itertools.count()
+        # node_id -> (crew_id, αύξων αριθμός) της επισκευής σε εξέλιξη· ό,τι άλλο είναι στο heap έχει ακυρωθεί
+        self._active_repairs: Dict[str, Tuple[str, int]] = {}
+        self.repaired_at: Dict[str, float] = {}  # node_id -> ώρα ολοκλήρωσης της επισκευής
+        self.rng = random.Random(seed)
+
+    @classmethod
+    def from_dict(cls, data: Dict, seed: Optional[int] = None) -> "WorldState":
+        """Builds a WorldState from the scenario JSON layout ({"nodes": {...}, "crews": {...}})."""
+        world = cls(seed)
+        for node_id, d in data.get("nodes", {}).items():
+            world.add_node(node_id, d["status"], d["type"], d["population_affected"], d["criticality"])
+        for crew_id, d in data.get("crews", {}).items():
+            world.add_crew(crew_id, d["status"], d["specialty"])
+        return world
+
+    @classmethod
+    def from_columns(cls, node_ids: List[str], statuses: List[str], types: List[str], populations: List[int],
+                     criticalities: List[str], crew_ids: List[str], crew_statuses: List[str],
+                     specialties: List[str], seed: Optional[int] = None) -> "WorldState":
+        """
+        Builds a WorldState from parallel columns (one entry per node / crew), e.g. a binary snapshot.
+        Same result as add_node/add_crew per record, but the indexes are filled in bulk.
+        """
+        world = cls(seed)
+        world.nodes = {n: Node(n, s, t, p, c)
+                       for n, s, t, p, c in zip(node_ids, statuses, types, populations, criticalities)}
+        for node_id, status in zip(node_ids, statuses):
+            world._nodes_by_status.setdefault(status, {})[node_id] = None
+        world.crews = {c: Crew(c, s, sp) for c, s, sp in zip(crew_ids, crew_statuses, specialties)}
+        for crew_id, status, specialty in zip(crew_ids, crew_statuses, specialties):
+            world._crews_by_status.setdefault(status, {})[crew_id] = None
+            world._crews_by_specialty.setdefault(specialty, {})[crew_id] = None
+        return world
+
+    def to_dict(self) -> Dict:
+        return {"nodes": {n: node.to_dict() for n, node in self.nodes.items()},
+                "crews": {c: crew.to_dict() for c, crew in self.crews.items()}}
+
+    def add_node(self, node_id: str, status: str, type: str, population_affected: int, criticality: str) -> Node:
+        if node_id in self.nodes:
+            self._nodes_by_status[self.nodes[node_id].status].pop(node_id, None)
+        node = self.nodes[node_id] = Node(node_id, status, type, population_affected, criticality)
+        self._nodes_by_status.setdefault(status, {})[node_id] = None
+        return node
+
+    def add_crew(self, crew_id: str, status: str, specialty: str) -> Crew:
+        if crew_id in self.crews:
+            old = self.crews[crew_id]
+            self._crews_by_status[old.status].pop(crew_id, None)
+            self._crews_by_specialty[old.specialty].pop(crew_id, None)
+        crew = self.crews[crew_id] = Crew(crew_id, status, specialty)
+        self._crews_by_status.setdefault(status, {})[crew_id] = None
+        self._crews_by_specialty.setdefault(specialty, {})[crew_id] = None
+        return crew
+
+    def set_node_status(self, node_id: str, status: str):
+        node = self.nodes[node_id]
+        if node.status != status:
+            self._nodes_by_status[node.status].pop(node_id, None)
+            self._nodes_by_status.setdefault(status, {})[node_id] = None
+            node.status = status
+
+    def set_crew_status(self, crew_id: str, status: str):
+        crew = self.crews[crew_id]
+        if crew.status != status:
+            self._crews_by_status[crew.status].pop(crew_id, None)
+            self._crews_by_status.setdefault(status, {})[crew_id] = None
+            crew.status = status
+
+    def node_ids_with_status(self, status: str) -> List[str]:
+        return list(self._nodes_by_status.get(status, ()))
+
+    def crew_ids_with_status(self, status: str) -> List[str]:
+        return list(self._crews_by_status.get(status, ()))
+
+    def count_nodes(self, status: str) -> int:
+        return len(self._nodes_by_status.get(status, ()))
+
+    def count_crews(self, status: str) -> int:
+        return len(self._crews_by_status.get(status, ()))
+
+    def available_crews(self, specialty: Optional[str] = None) -> List[str]:
+        """Available crew IDs, optionally only those with the given specialty."""
+        available = self._crews_by_status.get("Available", {})
+        if specialty is None:
+            return list(available)
+        same_specialty = self._crews_by_specialty.get(specialty, {})
+        if len(available) < len(same_specialty):
+            return [c for c in available if c in same_specialty]
+        return [c for c in same_specialty if c in available]
+
+    def available_crews_for(self, node_type: str) -> List[str]:
+        """Available crews able to fix a node of `node_type` (specialists first, then 'General')."""
+        specialists = [s for s in self._crews_by_specialty if s != "General" and crew_can_fix(s, node_type)]
+        return [c for s in specialists for c in self.available_crews(s)] + self.available_crews("General")
+
+    def schedule_repair(self, node_id: str, crew_id: str, duration: float) -> float:
+        """
+        Queues the completion of a repair `duration` minutes from now and returns its time.
+        Raises ValueError if `node_id` already has a repair in progress (cancel_repair it first).
+        """
+        if node_id in self._active_repairs:
+            raise ValueError(f"Node '{node_id}' is already being repaired by '{self._active_repairs[node_id][0]}'")
+        finish = self.clock + duration
+        seq = next(self._repair_seq)
+        heapq.heappush(self._repairs, (finish, seq, node_id, crew_id))
+        self._active_repairs[node_id] = (crew_id, seq)
+        return finish
+
+    def cancel_repair(self, node_id: str) -> Optional[str]:
+        """Drops the repair in progress on `node_id` (if any) and returns its crew; statuses are left as they are."""
+        entry = self._active_repairs.pop(node_id, None)
+        return entry[0] if entry else None
+
+    def repair_of(self, crew_id: str) -> Optional[str]:
+        """The node `crew_id` is repairing right now, or None."""
+        for node_id, (crew, _) in self._active_repairs.items():
+            if crew == crew_id:
+                return node_id
+        return None
+
+    def _is_active(self, event: Tuple[float, int, str, str]) -> bool:
+        return self._active_repairs.get(event[2]) == (event[3], event[1])
+
+    def pending_repairs(self) -> int:
+        return len(self._active_repairs)
+
+    def next_event_time(self) -> Optional[float]:
+        # Οι ακυρωμένες επισκευές βγαίνουν από το heap μόνο όταν φτάσουν στην κορυφή (lazy deletion)
+        while self._repairs and not self._is_active(self._repairs[0]):
+            heapq.heappop(self._repairs)
+        return self._repairs[0][0] if self._repairs else None
+
+    def advance(self) -> List[Tuple[str, str]]:
+        """
+        Moves the clock to the next repair completion and applies every repair that finishes at
+        that time: the node becomes 'Operational' and the crew 'Available' again.
+
+        Returns:
+            List[Tuple[str, str]]: (node_id, crew_id) of the completed repairs ([] if none are pending).
+        """
+        next_time = self.next_event_time()
+        if next_time is None:
+            return []
+        self.clock = next_time
+        completed = []
+        while self._repairs and self._repairs[0][0] == self.clock:
+            event = heapq.heappop(self._repairs)
+            if not self._is_active(event):
+                continue
+            _, _, node_id, crew_id = event
+            del self._active_repairs[node_id]
+            self.set_node_status(node_id, "Operational")
+            self.repaired_at[node_id] = self.clock
+            self.set_crew_status(crew_id, "Available")
+            completed.append((node_id, crew_id))
+        return completed
+
+    def advance_until(self, clock: float) -> List[Tuple[str, str]]:
+        """Applies every repair that finishes by `clock` and moves the clock there (never backwards)."""
+        completed = []
+        while (next_time := self.next_event_time()) is not None and next_time <= clock:
+            completed.extend(self.advance())
+        self.clock = max(self.clock, clock)
+        return completed